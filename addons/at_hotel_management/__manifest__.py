@@ -11,6 +11,7 @@
     'data': [
         'security/ir.model.access.csv',
         'data/booking_sequence.xml',
+        'data/ir_cron_data.xml',
         'report/hotel_booking_report_template.xml',
         'report/hotel_booking_report.xml',
         'views/hotel_views.xml',
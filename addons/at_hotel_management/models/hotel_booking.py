@@ -1,7 +1,14 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError, UserError
 from odoo import _
-from datetime import datetime
+from datetime import datetime, timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# The watermark of the availability cron is moved back by this margin, so that bookings
+# written by transactions still running when the cron started are picked up next run
+ROOM_AVAILABILITY_WATERMARK_MARGIN = timedelta(minutes=10)
 
 
 class HotelBooking(models.Model):
@@ -17,7 +24,7 @@ class HotelBooking(models.Model):
         ('double', 'Double'),
         ('suite', 'Suite')
     ], string='Room Type')
-    room_id = fields.Many2one('hotel.room', string="Room")
+    room_id = fields.Many2one('hotel.room', string="Room", index=True)
     room_number = fields.Char(string="Room Number", readonly=True)
     is_ac = fields.Selection([
         ('ac', 'AC'),
@@ -130,58 +137,116 @@ class HotelBooking(models.Model):
 
     @api.depends('room_type', 'is_ac', 'check_in', 'check_out')
     def _compute_available_rooms(self):
-        for booking in self:
-            if booking.room_type and booking.is_ac and booking.check_in and booking.check_out:
-                booking.available_room_ids = self._get_available_rooms(
-                    booking.room_type,
-                    booking.is_ac,
-                    booking.check_in,
-                    booking.check_out
-                )
-            else:
-                booking.available_room_ids = False
+        searchable = self.filtered(lambda b: b.room_type and b.is_ac and b.check_in and b.check_out)
+        available_room_ids = self._get_available_room_ids_multi([
+            (booking.room_type, booking.is_ac, booking.check_in, booking.check_out)
+            for booking in searchable
+        ])
+        for booking, room_ids in zip(searchable, available_room_ids):
+            booking.available_room_ids = self.env['hotel.room'].browse(room_ids)
+        (self - searchable).available_room_ids = False
 
 
     def _get_available_rooms(self, room_type, is_ac, check_in, check_out):
-        domain = [
-            ('room_type', '=', room_type),
-            ('is_ac', '=', is_ac),
-            ('status', '=', 'available')
-        ]
-        potential_rooms = self.env['hotel.room'].search(domain)
-        available_rooms = self.env['hotel.room']
-        for room in potential_rooms:
-            overlap = self.search_count([
-                ('room_id', '=', room.id),
-                ('state', 'in', ['confirmed', 'paid']),
-                ('check_in', '<', check_out),
-                ('check_out', '>', check_in)
-            ])
-            if not overlap:
-                available_rooms += room
-        return available_rooms
+        room_ids = self._get_available_room_ids_multi([(room_type, is_ac, check_in, check_out)])[0]
+        return self.env['hotel.room'].browse(room_ids)
+
+    @api.model
+    def _get_available_room_ids_multi(self, windows):
+        """Return, for each (room_type, is_ac, check_in, check_out) window, the ids of the
+        available rooms that have no confirmed or paid booking overlapping it.
+
+        All windows are answered by a single anti-join query, so the cost does not grow
+        with the number of candidate rooms or the number of windows asked for."""
+        if not windows:
+            return []
+        self.flush_model(['room_id', 'state', 'check_in', 'check_out'])
+        self.env['hotel.room'].flush_model(['name', 'room_type', 'is_ac', 'status'])
+        room_types, ac_types, check_ins, check_outs = zip(*windows)
+        self.env.cr.execute("""
+            SELECT req.idx, array_agg(room.id ORDER BY room.name, room.id)
+              FROM unnest(%s::int[], %s::varchar[], %s::varchar[], %s::timestamp[], %s::timestamp[])
+                   AS req(idx, room_type, is_ac, check_in, check_out)
+              JOIN hotel_room room
+                ON room.room_type = req.room_type
+               AND room.is_ac = req.is_ac
+               AND room.status = 'available'
+             WHERE NOT EXISTS (
+                   SELECT 1
+                     FROM hotel_booking booking
+                    WHERE booking.room_id = room.id
+                      AND booking.state IN ('confirmed', 'paid')
+                      AND booking.check_in < req.check_out
+                      AND booking.check_out > req.check_in)
+             GROUP BY req.idx
+        """, [list(range(len(windows))), list(room_types), list(ac_types),
+              list(check_ins), list(check_outs)])
+        room_ids_by_idx = dict(self.env.cr.fetchall())
+        return [room_ids_by_idx.get(idx, []) for idx in range(len(windows))]
+
+    @api.model
+    def _claim_available_room(self, room_type, is_ac, check_in, check_out, exclude_room_ids=()):
+        """Atomically claim a free room for the given window and return it, or an empty
+        recordset when every candidate is booked or being claimed by another transaction.
+
+        The first candidate is row-locked with FOR UPDATE SKIP LOCKED, so concurrent
+        bookings each take a different room instead of queueing on the same one. The lock
+        is held until the transaction ends, by which time the claiming booking has set the
+        room to not available. A transaction whose snapshot predates that commit fails to
+        lock the updated row with a serialization error and is retried by the server, which
+        re-runs the claim against the new state."""
+        if not (room_type and is_ac and check_in and check_out):
+            return self.env['hotel.room']
+        self.flush_model(['room_id', 'state', 'check_in', 'check_out'])
+        self.env['hotel.room'].flush_model(['name', 'room_type', 'is_ac', 'status'])
+        self.env.cr.execute("""
+            SELECT room.id
+              FROM hotel_room room
+             WHERE room.room_type = %s
+               AND room.is_ac = %s
+               AND room.status = 'available'
+               AND room.id != ALL(%s::int[])
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM hotel_booking booking
+                    WHERE booking.room_id = room.id
+                      AND booking.state IN ('confirmed', 'paid')
+                      AND booking.check_in < %s
+                      AND booking.check_out > %s)
+             ORDER BY room.name, room.id
+             LIMIT 1
+               FOR UPDATE OF room SKIP LOCKED
+        """, [room_type, is_ac, list(exclude_room_ids), check_out, check_in])
+        row = self.env.cr.fetchone()
+        room = self.env['hotel.room'].browse(row[0] if row else [])
+        if room:
+            # Mark the room taken in the same transaction that holds the lock
+            room.status = 'not_available'
+            room.flush_recordset(['status'])
+        return room
 
     @api.model_create_multi
     def create(self, vals_list):
+        claimed_room_ids = []
         for vals in vals_list:
             if vals.get('name', 'New') == 'New':
                 vals['name'] = self.env['ir.sequence'].next_by_code('hotel.booking') or '/'
 
             if vals.get('room_type') and vals.get('is_ac'):
-                available_rooms = self._get_available_rooms(
+                room = self._claim_available_room(
                     vals['room_type'],
                     vals['is_ac'],
                     vals.get('check_in'),
-                    vals.get('check_out')
+                    vals.get('check_out'),
+                    exclude_room_ids=claimed_room_ids
                 )
 
-                if available_rooms:
-                    room = available_rooms[0]
+                if room:
+                    claimed_room_ids.append(room.id)
                     vals.update({
                         'room_id': room.id,
                         'room_number': room.name
                     })
-                    room.status = 'not_available'
                 else:
                     raise ValidationError(
                         "No available rooms matching your criteria. \n\n"
@@ -191,7 +256,6 @@ class HotelBooking(models.Model):
                         "- Contact reception for assistance"
                     )
 
-
         records = super().create(vals_list)
         for record in records:
             if record.room_id:
@@ -220,17 +284,20 @@ class HotelBooking(models.Model):
 
 
     def action_confirm(self):
+        claimed_room_ids = []
         for rec in self:
             if not rec.room_id:
-                available_rooms = self._get_available_rooms(
+                room = self._claim_available_room(
                     rec.room_type,
                     rec.is_ac,
                     rec.check_in,
-                    rec.check_out
+                    rec.check_out,
+                    exclude_room_ids=claimed_room_ids
                 )
-                if available_rooms:
-                    rec.room_id = available_rooms[0]
-                    rec.room_number = available_rooms[0].name
+                if room:
+                    claimed_room_ids.append(room.id)
+                    rec.room_id = room
+                    rec.room_number = room.name
                 else:
                     raise UserError("No available rooms found. Please contact reception.")
 
@@ -328,14 +395,84 @@ class HotelBooking(models.Model):
 
 
     @api.model
-    def update_all_room_availabilities(self):
-        rooms = self.env['hotel.room'].search([])
-        for room in rooms:
-            active_booking = self.search([
-                ('room_id', '=', room.id),
-                ('state', 'in', ['confirmed', 'paid']),
-                ('check_out', '>', fields.Datetime.now())
-            ], limit=1)
-            room.status = not bool(active_booking)
-
+    def update_all_room_availabilities(self, changed_since=None, room_ids=None):
+        """Refresh hotel.room status from the bookings with two set-based UPDATEs.
+
+        Rooms holding a confirmed or paid booking that is not checked out yet become
+        'not_available', all others 'available'. When changed_since is given, only the
+        rooms whose bookings were modified or ended since then are refreshed, when
+        room_ids is given only those rooms.
+        Returns the number of rooms changed to each status."""
+        self.flush_model(['room_id', 'state', 'check_out'])
+        self.env['hotel.room'].flush_model(['status'])
+        params = {
+            'now': fields.Datetime.now(),
+            'since': changed_since,
+            'uid': self.env.uid,
+            'room_ids': list(room_ids or []),
+        }
+        scope = ''
+        if room_ids is not None:
+            scope = """
+               AND room.id = ANY(%(room_ids)s)"""
+        elif changed_since:
+            scope = """
+               AND room.id IN (
+                   SELECT room_id
+                     FROM hotel_booking
+                    WHERE write_date >= %(since)s
+                       OR (check_out > %(since)s AND check_out <= %(now)s))"""
+        busy_rooms = """
+            SELECT room_id
+              FROM hotel_booking
+             WHERE room_id IS NOT NULL
+               AND state IN ('confirmed', 'paid')
+               AND check_out > %(now)s"""
+        counts = {}
+        for status, condition in (('not_available', 'IN'), ('available', 'NOT IN')):
+            params['status'] = status
+            self.env.cr.execute("""
+                UPDATE hotel_room room
+                   SET status = %(status)s, write_date = %(now)s, write_uid = %(uid)s
+                 WHERE room.id {condition} ({busy_rooms})
+                   AND room.status IS DISTINCT FROM %(status)s{scope}
+            """.format(condition=condition, busy_rooms=busy_rooms, scope=scope), params)
+            counts[status] = self.env.cr.rowcount
+        self.env['hotel.room'].invalidate_model(['status', 'write_date', 'write_uid'])
+        _logger.info("Room availability refreshed: %(available)s available, "
+                     "%(not_available)s not available", counts)
+        return counts
 
+    @api.model
+    def _cron_update_room_availabilities(self):
+        """Incremental refresh, only touching the rooms whose bookings changed since the
+        previous run of the cron. write_date is the start of the writing transaction, so
+        the watermark is the start of this one, minus a margin for the transactions that
+        were still running."""
+        param = self.env['ir.config_parameter'].sudo()
+        watermark = param.get_param('at_hotel_management.room_availability_watermark')
+        now = self.env.cr.now() - ROOM_AVAILABILITY_WATERMARK_MARGIN
+        self.update_all_room_availabilities(
+            changed_since=fields.Datetime.to_datetime(watermark) if watermark else None)
+        param.set_param('at_hotel_management.room_availability_watermark',
+                        fields.Datetime.to_string(now))
+
+    def write(self, vals):
+        """A booking moved to another room leaves no write_date behind on its previous
+        room for the availability cron, the previous rooms are refreshed right away."""
+        old_room_ids = []
+        if 'room_id' in vals:
+            old_room_ids = [room_id for room_id in self.room_id.ids if room_id != vals['room_id']]
+        res = super().write(vals)
+        if old_room_ids:
+            self.env['hotel.booking'].update_all_room_availabilities(room_ids=old_room_ids)
+        return res
+
+    def unlink(self):
+        """Deleted bookings leave no write_date behind for the availability cron, their
+        rooms are refreshed right away."""
+        room_ids = self.room_id.ids
+        res = super().unlink()
+        if room_ids:
+            self.env['hotel.booking'].update_all_room_availabilities(room_ids=room_ids)
+        return res
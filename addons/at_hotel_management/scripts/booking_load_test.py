@@ -0,0 +1,92 @@
+"""Fire N parallel hotel bookings against a running Odoo server and report how the
+rooms were allocated.
+
+Every booking goes through its own XML-RPC connection, so with a multi-worker server
+the requests really run in separate transactions. The run fails when two confirmed
+bookings end up on the same room for overlapping periods.
+
+Usage:
+    python booking_load_test.py --url http://localhost:8069 --db odoo \\
+        --user admin --password admin --bookings 50 --room-type single --is-ac ac
+"""
+import argparse
+import time
+import xmlrpc.client
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--user', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--bookings', type=int, default=20, help="number of parallel bookings")
+    parser.add_argument('--workers', type=int, default=0, help="client threads, defaults to --bookings")
+    parser.add_argument('--room-type', default='single', choices=['single', 'double', 'suite'])
+    parser.add_argument('--is-ac', default='ac', choices=['ac', 'non_ac'])
+    parser.add_argument('--nights', type=int, default=2)
+    return parser.parse_args()
+
+
+def book(args, uid, guest_id, check_in, check_out):
+    models = xmlrpc.client.ServerProxy(f'{args.url}/xmlrpc/2/object', allow_none=True)
+    started = time.perf_counter()
+    try:
+        booking_id = models.execute_kw(args.db, uid, args.password, 'hotel.booking', 'create', [{
+            'guest_id': guest_id,
+            'room_type': args.room_type,
+            'is_ac': args.is_ac,
+            'check_in': check_in,
+            'check_out': check_out,
+        }])
+        models.execute_kw(args.db, uid, args.password, 'hotel.booking', 'action_confirm', [[booking_id]])
+        room = models.execute_kw(args.db, uid, args.password, 'hotel.booking', 'read',
+                                 [[booking_id], ['room_id']])[0]['room_id']
+        return {'booking_id': booking_id, 'room_id': room and room[0], 'error': None,
+                'duration': time.perf_counter() - started}
+    except xmlrpc.client.Fault as e:
+        return {'booking_id': None, 'room_id': None, 'error': e.faultString.strip().splitlines()[-1],
+                'duration': time.perf_counter() - started}
+
+
+def main():
+    args = parse_args()
+    common = xmlrpc.client.ServerProxy(f'{args.url}/xmlrpc/2/common')
+    uid = common.authenticate(args.db, args.user, args.password, {})
+    if not uid:
+        raise SystemExit("Authentication failed")
+    models = xmlrpc.client.ServerProxy(f'{args.url}/xmlrpc/2/object', allow_none=True)
+    guest_id = models.execute_kw(args.db, uid, args.password, 'hotel.customer', 'create',
+                                 [{'name': f'Load test {datetime.now():%Y-%m-%d %H:%M:%S}'}])
+
+    # All bookings ask for the same window so that they compete for the same rooms
+    check_in = (datetime.now() + timedelta(days=365)).replace(hour=12, minute=0, second=0, microsecond=0)
+    check_out = check_in + timedelta(days=args.nights)
+    window = (check_in.strftime('%Y-%m-%d %H:%M:%S'), check_out.strftime('%Y-%m-%d %H:%M:%S'))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers or args.bookings) as executor:
+        results = list(executor.map(lambda _i: book(args, uid, guest_id, *window), range(args.bookings)))
+    elapsed = time.perf_counter() - started
+
+    booked = [r for r in results if r['room_id']]
+    errors = Counter(r['error'] for r in results if r['error'])
+    rooms = Counter(r['room_id'] for r in booked)
+    double_booked = {room_id: count for room_id, count in rooms.items() if count > 1}
+    durations = sorted(r['duration'] for r in results)
+
+    print(f"bookings requested : {args.bookings}")
+    print(f"bookings allocated : {len(booked)} on {len(rooms)} rooms")
+    print(f"elapsed            : {elapsed:.2f}s ({args.bookings / elapsed:.1f} bookings/s)")
+    print(f"latency p50 / max  : {durations[len(durations) // 2]:.3f}s / {durations[-1]:.3f}s")
+    for error, count in errors.most_common():
+        print(f"error x{count:<4}      : {error}")
+    if double_booked:
+        raise SystemExit(f"Rooms allocated more than once: {double_booked}")
+
+
+if __name__ == '__main__':
+    main()
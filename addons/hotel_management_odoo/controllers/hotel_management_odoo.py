@@ -20,10 +20,17 @@
 #
 ###############################################################################
 import json
+import tempfile
+from werkzeug.wsgi import wrap_file
 from odoo import http
 from odoo.http import content_disposition, request
 from odoo.tools import html_escape
 
+# Size of the chunks the xlsx file is sent to the client with
+XLSX_STREAM_CHUNK_SIZE = 64 * 1024
+# Report wizards allowed to build an xlsx report through this route
+XLSX_REPORT_MODELS = ('room.booking.detail', 'sale.order.detail')
+
 
 class XLSXReportController(http.Controller):
     """Controller for XlsX report"""
@@ -32,18 +39,33 @@ class XLSXReportController(http.Controller):
                 methods=['POST'], csrf=False)
     def get_room_booking_report_xlsx(self, model, options, output_format,
                                      report_name):
-        """Function for generating xlsx report"""
-        report_obj = request.env[model].sudo()
+        """Function for generating xlsx report. The report model writes the
+        workbook to a temporary file, which is then streamed to the client
+        by chunks and removed once sent. The rows are read as the current
+        user, so that the access rights and record rules apply."""
+        if model not in XLSX_REPORT_MODELS:
+            return request.not_found()
+        report_obj = request.env[model]
         options = json.loads(options)
         try:
             if output_format == 'xlsx':
+                output = tempfile.TemporaryFile(suffix='.xlsx')
+                try:
+                    report_obj.get_xlsx_report(options, output)
+                    size = output.tell()
+                    output.seek(0)
+                except Exception:
+                    output.close()
+                    raise
                 response = request.make_response(
-                    None,
+                    wrap_file(request.httprequest.environ, output,
+                              buffer_size=XLSX_STREAM_CHUNK_SIZE),
                     headers=[('Content-Type', 'application/vnd.ms-excel'),
                              ('Content-Disposition',
-                              content_disposition(report_name + '.xlsx'))]
+                              content_disposition(report_name + '.xlsx')),
+                             ('Content-Length', size)]
                 )
-                report_obj.get_xlsx_report(options, response)
+                response.direct_passthrough = True
                 response.set_cookie('fileToken', 'dummy token')
                 return response
         except Exception as e:
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: ADARSH K (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Lines checking out before they check in can not be indexed as a
+    tsrange nor pass the new check constraint, their checkout is moved to
+    their checkin."""
+    cr.execute("""
+        UPDATE room_booking_line
+           SET checkout_date = checkin_date
+         WHERE checkout_date < checkin_date
+     RETURNING id
+    """)
+    line_ids = [row[0] for row in cr.fetchall()]
+    if line_ids:
+        _logger.warning("Checkout of room booking lines %s moved to their "
+                        "checkin, it was before it", line_ids)
@@ -28,6 +28,7 @@ from . import fleet_booking_line
 from . import fleet_vehicle_model
 from . import food_booking_line
 from . import hotel_amenity
+from . import hotel_dashboard
 from . import hotel_floor
 from . import hotel_room
 from . import hotel_service
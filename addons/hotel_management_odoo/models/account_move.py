@@ -19,7 +19,7 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class AccountMove(models.Model):
@@ -31,3 +31,19 @@ class AccountMove(models.Model):
                                        string="Booking Reference",
                                        readonly=True, help="Choose the Booking"
                                                            "Reference")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidates the hotel dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Invalidates the hotel dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidates the hotel dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().unlink()
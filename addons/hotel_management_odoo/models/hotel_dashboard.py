@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: ADARSH K (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+import threading
+import time
+from datetime import datetime, timedelta
+from odoo import api, fields, models
+from odoo.tools.safe_eval import pytz
+
+# Seconds a computed set of dashboard counters stays valid. Writes on the
+# models feeding the dashboard clear the cache of the current worker once
+# they are committed, the TTL bounds how long other workers may keep
+# serving older counters.
+DASHBOARD_CACHE_TTL = 60
+
+_dashboard_cache = {}
+_dashboard_cache_lock = threading.Lock()
+
+STAFF_GROUP_XMLIDS = [
+    'hotel_management_odoo.hotel_group_admin',
+    'hotel_management_odoo.cleaning_team_group_head',
+    'hotel_management_odoo.cleaning_team_group_user',
+    'hotel_management_odoo.hotel_group_reception',
+    'hotel_management_odoo.maintenance_team_group_leader',
+    'hotel_management_odoo.maintenance_team_group_user',
+]
+
+
+class HotelDashboard(models.AbstractModel):
+    """Computes the counters shown on the hotel dashboard. Every counter is
+    answered by a single aggregate query and the result is kept in a short
+    lived, per company cache."""
+    _name = 'hotel.dashboard'
+    _description = 'Hotel Dashboard Statistics'
+
+    @api.model
+    def get_stats(self):
+        """Returns the dashboard counters, from the cache when still fresh.
+        The counters go through the record rules, so they are cached per
+        user."""
+        tz_name = self.env.user.tz or 'UTC'
+        key = (self.env.cr.dbname, self.env.uid,
+               tuple(sorted(self.env.companies.ids)),
+               self.env.user.company_id.id, tz_name,
+               fields.Date.context_today(self))
+        now = time.monotonic()
+        with _dashboard_cache_lock:
+            cached = _dashboard_cache.get(key)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+        stats = self._compute_stats(tz_name)
+        with _dashboard_cache_lock:
+            _dashboard_cache[key] = (now + DASHBOARD_CACHE_TTL, stats)
+        return dict(stats)
+
+    @api.model
+    def _invalidate_stats(self):
+        """Drops the cached counters of the current database, now and once
+        the transaction is committed. Counters computed by a concurrent
+        request before the commit would otherwise be cached again with the
+        previous data."""
+        dbname = self.env.cr.dbname
+
+        def invalidate():
+            with _dashboard_cache_lock:
+                for key in [key for key in _dashboard_cache
+                            if key[0] == dbname]:
+                    _dashboard_cache.pop(key, None)
+
+        invalidate()
+        postcommit = self.env.cr.postcommit
+        if not postcommit.data.get('hotel.dashboard.invalidate'):
+            postcommit.data['hotel.dashboard.invalidate'] = True
+            postcommit.add(invalidate)
+
+    @api.model
+    def _compute_stats(self, tz_name):
+        """Computes every dashboard counter with one aggregate query each"""
+        today_utc = pytz.timezone('UTC').localize(datetime.today(),
+                                                  is_dst=False)
+        context_today = today_utc.astimezone(pytz.timezone(tz_name)).date()
+        today = fields.Date.today()
+        now = fields.Datetime.now()
+        booking_counts = dict(self.env['room.booking']._read_group(
+            [('state', 'in', ['check_in', 'reserved'])],
+            ['state'], ['__count']))
+        # Checkout dates are compared on their stored date, as before
+        check_out = self.env['room.booking.line'].search_count([
+            ('booking_id', '!=', False),
+            ('checkout_date', '>=', context_today),
+            ('checkout_date', '<', context_today + timedelta(days=1))])
+        staff_groups = [self.env.ref(xmlid).id for xmlid in STAFF_GROUP_XMLIDS]
+        staff = self.env['res.users'].search_count(
+            [('groups_id', 'in', staff_groups)])
+        total_vehicle = self.env['fleet.vehicle.model'].search_count([])
+        available_vehicle = total_vehicle - self.env[
+            'fleet.booking.line'].search_count([('state', '=', 'check_in')])
+        food_order = self.env['food.booking.line'].search_count([
+            '|', ('booking_id', '=', False),
+            ('booking_id.state', 'not in', ['check_out', 'cancel', 'done'])])
+        Event = self.env['event.event']
+        revenue = dict(self.env['account.move']._read_group(
+            [('ref', 'like', 'BOOKING'),
+             ('payment_state', 'in', ['paid', 'not_paid'])],
+            ['payment_state'], ['amount_total:sum']))
+        today_revenue = self.env['account.move']._read_group(
+            [('ref', 'like', 'BOOKING'), ('payment_state', '=', 'paid'),
+             ('date', '=', today)], [], ['amount_total:sum'])[0][0]
+        return {
+            'total_room': self.env['hotel.room'].search_count([]),
+            'available_room': self.env['hotel.room'].search_count(
+                [('status', '=', 'available')]),
+            'staff': staff,
+            'check_in': booking_counts.get('check_in', 0),
+            'reservation': booking_counts.get('reserved', 0),
+            'check_out': check_out,
+            'total_vehicle': total_vehicle,
+            'available_vehicle': available_vehicle,
+            'total_event': Event.search_count([]),
+            'today_events': Event.search_count([
+                ('date_end', '>=', today),
+                ('date_end', '<', today + timedelta(days=1))]),
+            'pending_events': Event.search_count([('date_end', '>=', now)]),
+            'food_items': self.env['lunch.product'].search_count([]),
+            'food_order': food_order,
+            'total_revenue': round(revenue.get('paid', 0.0), 2),
+            'today_revenue': round(today_revenue or 0.0, 2),
+            'pending_payment': round(revenue.get('not_paid', 0.0), 2),
+            'currency_symbol': self.env.user.company_id.currency_id.symbol,
+            'currency_position': self.env.user.company_id.currency_id.position
+        }
@@ -84,6 +84,29 @@ class HotelRoom(models.Model):
     description = fields.Html(string='Description', help="Add description",
                               translate=True)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().unlink()
+
+    def _set_status(self, status):
+        """Sets the status of all the rooms with a single write"""
+        self.write({
+            'status': status,
+            'is_room_avail': status == 'available',
+        })
+
     @api.constrains("num_person")
     def _check_capacity(self):
         """Check capacity function"""
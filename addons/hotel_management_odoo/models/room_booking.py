@@ -19,10 +19,36 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
+from collections import defaultdict
 from datetime import datetime, timedelta
-from odoo import api, fields, models, _
+from odoo import api, Command, fields, models, _
 from odoo.exceptions import ValidationError
-from odoo.tools.safe_eval import pytz
+from .room_booking_line import ROOM_BLOCKING_STATES
+
+# Line types of a booking and the one2many field holding them
+BOOKING_LINE_FIELDS = {
+    'room': 'room_line_ids',
+    'food': 'food_order_line_ids',
+    'service': 'service_line_ids',
+    'fleet': 'vehicle_line_ids',
+    'event': 'event_line_ids',
+}
+# Front desk transitions: target booking state, target room status and the
+# booking states the transition is allowed from
+FRONT_DESK_TRANSITIONS = {
+    'reserve': ('reserved', 'reserved', ('draft',)),
+    'check_in': ('check_in', 'occupied', ('draft', 'reserved')),
+    'check_out': ('check_out', 'available', ('check_in',)),
+    'cancel': ('cancel', 'available', ('draft', 'reserved')),
+}
+# Product type and product field of each booking line model
+BOOKING_LINE_PRODUCTS = {
+    'room.booking.line': ('room', 'room_id'),
+    'food.booking.line': ('food', 'food_id'),
+    'service.booking.line': ('service', 'service_id'),
+    'fleet.booking.line': ('fleet', 'fleet_id'),
+    'event.booking.line': ('event', 'event_id'),
+}
 
 
 class RoomBooking(models.Model):
@@ -239,8 +265,19 @@ class RoomBooking(models.Model):
         if vals_list.get('name', 'New') == 'New':
             vals_list['name'] = self.env['ir.sequence'].next_by_code(
                 'room.booking')
+        self.env['hotel.dashboard']._invalidate_stats()
         return super().create(vals_list)
 
+    def write(self, vals):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().unlink()
+
     @api.depends('partner_id')
     def _compute_user_id(self):
         """Computes the User id"""
@@ -277,115 +314,97 @@ class RoomBooking(models.Model):
                  'event_line_ids.price_subtotal', 'event_line_ids.price_tax',
                  'event_line_ids.price_total',
                  )
-    def _compute_amount_untaxed(self, flag=False):
+    def _compute_amount_untaxed(self):
         """Compute the total amounts of the Sale Order"""
-        amount_untaxed_room = 0.0
-        amount_untaxed_food = 0.0
-        amount_untaxed_fleet = 0.0
-        amount_untaxed_event = 0.0
-        amount_untaxed_service = 0.0
-        amount_taxed_room = 0.0
-        amount_taxed_food = 0.0
-        amount_taxed_fleet = 0.0
-        amount_taxed_event = 0.0
-        amount_taxed_service = 0.0
-        amount_total_room = 0.0
-        amount_total_food = 0.0
-        amount_total_fleet = 0.0
-        amount_total_event = 0.0
-        amount_total_service = 0.0
-        room_lines = self.room_line_ids
-        food_lines = self.food_order_line_ids
-        service_lines = self.service_line_ids
-        fleet_lines = self.vehicle_line_ids
-        event_lines = self.event_line_ids
-        booking_list = []
-        account_move_line = self.env['account.move.line'].search_read(
-            domain=[('ref', '=', self.name),
-                    ('display_type', '!=', 'payment_term')],
-            fields=['name', 'quantity', 'price_unit', 'product_type'], )
-        for rec in account_move_line:
-            del rec['id']
-        if room_lines:
-            amount_untaxed_room += sum(room_lines.mapped('price_subtotal'))
-            amount_taxed_room += sum(room_lines.mapped('price_tax'))
-            amount_total_room += sum(room_lines.mapped('price_total'))
-            for room in room_lines:
-                booking_dict = {'name': room.room_id.name,
-                                'quantity': room.uom_qty,
-                                'price_unit': room.price_unit,
-                                'product_type': 'room'}
-                if booking_dict not in account_move_line:
-                    if not account_move_line:
-                        booking_list.append(booking_dict)
-                    else:
-                        for rec in account_move_line:
-                            if rec['product_type'] == 'room':
-                                if booking_dict['name'] == rec['name'] and \
-                                        booking_dict['price_unit'] == rec[
-                                    'price_unit'] and booking_dict['quantity']\
-                                        != rec['quantity']:
-                                    booking_list.append(
-                                        {'name': room.room_id.name,
-                                         "quantity": booking_dict[
-                                                         'quantity'] - rec[
-                                                         'quantity'],
-                                         "price_unit": room.price_unit,
-                                         "product_type": 'room'})
-                                else:
-                                    booking_list.append(booking_dict)
-                    if flag:
-                        room.booking_line_visible = True
-        if food_lines:
-            for food in food_lines:
-                booking_list.append(self.create_list(food))
-            amount_untaxed_food += sum(food_lines.mapped('price_subtotal'))
-            amount_taxed_food += sum(food_lines.mapped('price_tax'))
-            amount_total_food += sum(food_lines.mapped('price_total'))
-        if service_lines:
-            for service in service_lines:
-                booking_list.append(self.create_list(service))
-            amount_untaxed_service += sum(
-                service_lines.mapped('price_subtotal'))
-            amount_taxed_service += sum(service_lines.mapped('price_tax'))
-            amount_total_service += sum(service_lines.mapped('price_total'))
-        if fleet_lines:
-            for fleet in fleet_lines:
-                booking_list.append(self.create_list(fleet))
-            amount_untaxed_fleet += sum(fleet_lines.mapped('price_subtotal'))
-            amount_taxed_fleet += sum(fleet_lines.mapped('price_tax'))
-            amount_total_fleet += sum(fleet_lines.mapped('price_total'))
-        if event_lines:
-            for event in event_lines:
-                booking_list.append(self.create_list(event))
-            amount_untaxed_event += sum(event_lines.mapped('price_subtotal'))
-            amount_taxed_event += sum(event_lines.mapped('price_tax'))
-            amount_total_event += sum(event_lines.mapped('price_total'))
+        line_totals = self._get_line_totals()
         for rec in self:
-            rec.amount_untaxed = amount_untaxed_food + amount_untaxed_room + \
-                                 amount_untaxed_fleet + \
-                                 amount_untaxed_event + amount_untaxed_service
-            rec.amount_untaxed_food = amount_untaxed_food
-            rec.amount_untaxed_room = amount_untaxed_room
-            rec.amount_untaxed_fleet = amount_untaxed_fleet
-            rec.amount_untaxed_event = amount_untaxed_event
-            rec.amount_untaxed_service = amount_untaxed_service
-            rec.amount_tax = (amount_taxed_food + amount_taxed_room
-                              + amount_taxed_fleet
-                              + amount_taxed_event + amount_taxed_service)
-            rec.amount_taxed_food = amount_taxed_food
-            rec.amount_taxed_room = amount_taxed_room
-            rec.amount_taxed_fleet = amount_taxed_fleet
-            rec.amount_taxed_event = amount_taxed_event
-            rec.amount_taxed_service = amount_taxed_service
-            rec.amount_total = (amount_total_food + amount_total_room
-                                + amount_total_fleet + amount_total_event
-                                + amount_total_service)
-            rec.amount_total_food = amount_total_food
-            rec.amount_total_room = amount_total_room
-            rec.amount_total_fleet = amount_total_fleet
-            rec.amount_total_event = amount_total_event
-            rec.amount_total_service = amount_total_service
+            totals = line_totals.get(rec.id, {})
+            untaxed, taxed, total = {}, {}, {}
+            for line_type in BOOKING_LINE_FIELDS:
+                untaxed[line_type], taxed[line_type], total[line_type] = \
+                    totals.get(line_type, (0.0, 0.0, 0.0))
+            rec.amount_untaxed = sum(untaxed.values())
+            rec.amount_untaxed_food = untaxed['food']
+            rec.amount_untaxed_room = untaxed['room']
+            rec.amount_untaxed_fleet = untaxed['fleet']
+            rec.amount_untaxed_event = untaxed['event']
+            rec.amount_untaxed_service = untaxed['service']
+            rec.amount_tax = sum(taxed.values())
+            rec.amount_taxed_food = taxed['food']
+            rec.amount_taxed_room = taxed['room']
+            rec.amount_taxed_fleet = taxed['fleet']
+            rec.amount_taxed_event = taxed['event']
+            rec.amount_taxed_service = taxed['service']
+            rec.amount_total = sum(total.values())
+            rec.amount_total_food = total['food']
+            rec.amount_total_room = total['room']
+            rec.amount_total_fleet = total['fleet']
+            rec.amount_total_event = total['event']
+            rec.amount_total_service = total['service']
+
+    def _get_line_totals(self):
+        """Returns the (untaxed, tax, total) sums of every line type, per
+        booking: ``{booking_id: {line_type: (untaxed, tax, total)}}``.
+        Saved bookings are aggregated with one read_group per line model,
+        whatever the number of bookings; bookings being edited in a form are
+        summed from their cached lines."""
+        line_totals = {}
+        new_bookings = self.filtered(
+            lambda rec: isinstance(rec.id, models.NewId))
+        for rec in new_bookings:
+            line_totals[rec.id] = {
+                line_type: (sum(rec[field_name].mapped('price_subtotal')),
+                            sum(rec[field_name].mapped('price_tax')),
+                            sum(rec[field_name].mapped('price_total')))
+                for line_type, field_name in BOOKING_LINE_FIELDS.items()}
+        saved_bookings = self - new_bookings
+        if not saved_bookings:
+            return line_totals
+        for line_type, field_name in BOOKING_LINE_FIELDS.items():
+            line_model = self._fields[field_name].comodel_name
+            for booking, untaxed, tax, total in self.env[
+                    line_model]._read_group(
+                    [('booking_id', 'in', saved_bookings.ids)],
+                    ['booking_id'],
+                    ['price_subtotal:sum', 'price_tax:sum',
+                     'price_total:sum']):
+                line_totals.setdefault(booking.id, {})[line_type] = (
+                    untaxed, tax, total)
+        return line_totals
+
+    def _prepare_invoice_booking_list(self):
+        """Returns the booking lines which are not invoiced yet, as a list of
+        dictionaries with the name, quantity, price_unit and product_type of
+        the invoice lines to create. Only used when invoicing.
+
+        The quantities already invoiced are read once and keyed by
+        (product_type, name, price_unit), so each booking line is matched
+        with a dictionary lookup."""
+        self.ensure_one()
+        invoiced_qty = defaultdict(float)
+        for move_line in self.env['account.move.line'].search_read(
+                domain=[('ref', '=', self.name),
+                        ('display_type', '!=', 'payment_term')],
+                fields=['name', 'quantity', 'price_unit', 'product_type']):
+            invoiced_qty[(move_line['product_type'], move_line['name'],
+                          move_line['price_unit'])] += move_line['quantity']
+        booking_list = []
+        visible_room_lines = self.env['room.booking.line']
+        for field_name in BOOKING_LINE_FIELDS.values():
+            for line in self[field_name]:
+                booking_dict = self.create_list(line)
+                key = (booking_dict['product_type'], booking_dict['name'],
+                       booking_dict['price_unit'])
+                already_invoiced = min(invoiced_qty[key],
+                                       booking_dict['quantity'])
+                invoiced_qty[key] -= already_invoiced
+                booking_dict['quantity'] -= already_invoiced
+                if not booking_dict['quantity']:
+                    continue
+                booking_list.append(booking_dict)
+                if line._name == 'room.booking.line':
+                    visible_room_lines |= line
+        visible_room_lines.booking_line_visible = True
         return booking_list
 
     @api.onchange('need_food')
@@ -446,32 +465,15 @@ class RoomBooking(models.Model):
                         % line.room_id.name
                     )
                 ids.add(line.room_id.id)
+            if record.state in ROOM_BLOCKING_STATES:
+                record.room_line_ids._check_room_availability()
 
     def create_list(self, line_ids):
         """Returns a Dictionary containing the Booking line Values"""
-        account_move_line = self.env['account.move.line'].search_read(
-            domain=[('ref', '=', self.name),
-                    ('display_type', '!=', 'payment_term')],
-            fields=['name', 'quantity', 'price_unit', 'product_type'], )
-        for rec in account_move_line:
-            del rec['id']
         booking_dict = {}
         for line in line_ids:
-            name = ""
-            product_type = ""
-            if line_ids._name == 'food.booking.line':
-                name = line.food_id.name
-                product_type = 'food'
-            elif line_ids._name == 'fleet.booking.line':
-                name = line.fleet_id.name
-                product_type = 'fleet'
-            elif line_ids._name == 'service.booking.line':
-                name = line.service_id.name
-                product_type = 'service'
-            elif line_ids._name == 'event.booking.line':
-                name = line.event_id.name
-                product_type = 'event'
-            booking_dict = {'name': name,
+            product_type, product_field = BOOKING_LINE_PRODUCTS[line._name]
+            booking_dict = {'name': line[product_field].name,
                             'quantity': line.uom_qty,
                             'price_unit': line.price_unit,
                             'product_type': product_type}
@@ -479,7 +481,7 @@ class RoomBooking(models.Model):
 
     def action_reserve(self):
         """Button Reserve Function"""
-        if self.state == 'reserved':
+        if len(self) == 1 and self.state == 'reserved':
             message = _("Room Already Reserved.")
             return {
                 'type': 'ir.actions.client',
@@ -490,35 +492,24 @@ class RoomBooking(models.Model):
                     'next': {'type': 'ir.actions.act_window_close'},
                 }
             }
-        if self.room_line_ids:
-            for room in self.room_line_ids:
-                room.room_id.write({
-                    'status': 'reserved',
-                })
-                room.room_id.is_room_avail = False
-            self.write({"state": "reserved"})
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'type': 'success',
-                    'message': "Rooms reserved Successfully!",
-                    'next': {'type': 'ir.actions.act_window_close'},
-                }
+        bookings = self.filtered(lambda booking: booking.state != 'reserved')
+        bookings._check_front_desk_transition('reserve')
+        bookings._apply_front_desk_transition('reserve')
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': "Rooms reserved Successfully!",
+                'next': {'type': 'ir.actions.act_window_close'},
             }
-        raise ValidationError(_("Please Enter Room Details"))
+        }
 
     def action_cancel(self):
         """
         @param self: object pointer
         """
-        if self.room_line_ids:
-            for room in self.room_line_ids:
-                room.room_id.write({
-                    'status': 'available',
-                })
-                room.room_id.is_room_avail = True
-        self.write({"state": "cancel"})
+        self._apply_front_desk_transition('cancel')
 
     def action_maintenance_request(self):
         """
@@ -570,35 +561,27 @@ class RoomBooking(models.Model):
 
     def action_checkout(self):
         """Button action_heck_out function"""
-        self.write({"state": "check_out"})
-        for room in self.room_line_ids:
-            room.room_id.write({
-                'status': 'available',
-                'is_room_avail': True
-            })
-            room.write({'checkout_date': datetime.today()})
+        self._apply_front_desk_transition('check_out')
 
     def action_invoice(self):
         """Method for creating invoice"""
         if not self.room_line_ids:
             raise ValidationError(_("Please Enter Room Details"))
-        booking_list = self._compute_amount_untaxed(True)
+        booking_list = self._prepare_invoice_booking_list()
         if booking_list:
             account_move = self.env["account.move"].create([{
                 'move_type': 'out_invoice',
                 'invoice_date': fields.Date.today(),
                 'partner_id': self.partner_id.id,
                 'ref': self.name,
-            }])
-            for rec in booking_list:
-                account_move.invoice_line_ids.create([{
+                'invoice_line_ids': [Command.create({
                     'name': rec['name'],
                     'quantity': rec['quantity'],
                     'price_unit': rec['price_unit'],
-                    'move_id': account_move.id,
                     'price_subtotal': rec['quantity'] * rec['price_unit'],
                     'product_type': rec['product_type'],
-                }])
+                }) for rec in booking_list],
+            }])
             self.write({'invoice_status': "invoiced"})
             self.invoice_button_visible = True
             return {
@@ -628,111 +611,126 @@ class RoomBooking(models.Model):
         """
         @param self: object pointer
         """
-        if not self.room_line_ids:
-            raise ValidationError(_("Please Enter Room Details"))
-        else:
-            for room in self.room_line_ids:
-                room.room_id.write({
-                    'status': 'occupied',
-                })
-                room.room_id.is_room_avail = False
-            self.write({"state": "check_in"})
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'type': 'success',
-                    'message': "Booking Checked In Successfully!",
-                    'next': {'type': 'ir.actions.act_window_close'},
-                }
+        self._check_front_desk_transition('check_in')
+        self._apply_front_desk_transition('check_in')
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': "Booking Checked In Successfully!",
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+    def _get_front_desk_errors(self, transition):
+        """Returns the bookings which cannot go through the given front desk
+        transition, mapped to the reason. Room availability of the whole
+        selection is checked with a single query, and bookings of the
+        selection competing for the same room are also reported."""
+        from_states = FRONT_DESK_TRANSITIONS[transition][2]
+        errors = {}
+        for booking in self:
+            if booking.state not in from_states:
+                errors[booking] = _(
+                    "%(folio)s: this operation is not allowed in the "
+                    "%(state)s state.", folio=booking.name,
+                    state=booking.state)
+            elif transition in ('reserve', 'check_in') and \
+                    not booking.room_line_ids:
+                errors[booking] = _("%s: Please Enter Room Details",
+                                    booking.name)
+        if transition not in ('reserve', 'check_in'):
+            return errors
+        bookings = self.filtered(lambda booking: booking not in errors)
+        for line, folio in bookings.room_line_ids._get_room_conflicts().items():
+            errors.setdefault(line.booking_id, _(
+                "%(booking)s: Room %(room)s is already booked on %(folio)s.",
+                booking=line.booking_id.name, room=line.room_id.name,
+                folio=folio))
+        # Bookings already holding their rooms win over the draft ones
+        held_periods = defaultdict(list)
+        for booking in bookings.sorted(
+                lambda booking: booking.state not in ROOM_BLOCKING_STATES):
+            if booking in errors:
+                continue
+            lines = booking.room_line_ids
+            for line in lines:
+                folio = next((folio for checkin, checkout, folio
+                              in held_periods[line.room_id.id]
+                              if line.checkin_date < checkout
+                              and checkin < line.checkout_date), False)
+                if folio:
+                    errors[booking] = _(
+                        "%(booking)s: Room %(room)s is already booked on "
+                        "%(folio)s.", booking=booking.name,
+                        room=line.room_id.name, folio=folio)
+                    break
+            else:
+                for line in lines:
+                    held_periods[line.room_id.id].append(
+                        (line.checkin_date, line.checkout_date, booking.name))
+        return errors
+
+    def _check_front_desk_transition(self, transition):
+        """Raises a ValidationError if one of the bookings cannot go through
+        the given front desk transition"""
+        errors = self._get_front_desk_errors(transition)
+        if errors:
+            raise ValidationError("\n".join(errors.values()))
+
+    def _apply_front_desk_transition(self, transition):
+        """Moves all the bookings to the state of the transition. The rooms
+        of the bookings are updated together, with one write per status."""
+        state, room_status = FRONT_DESK_TRANSITIONS[transition][:2]
+        self.write({'state': state})
+        self.room_line_ids.room_id._set_status(room_status)
+        if transition == 'check_out':
+            self.room_line_ids.write({'checkout_date': datetime.today()})
+
+    def process_front_desk_list(self, transition):
+        """Processes a whole arrival or departure list in one transaction.
+        Bookings which cannot be processed are reported and left untouched,
+        the others are processed together.
+
+        :param transition: one of 'reserve', 'check_in', 'check_out' and
+            'cancel'
+        :return: dictionary with the ids of the processed bookings and the
+            list of errors, each error being a dictionary with the id, name
+            and message of the rejected booking
+        """
+        if transition not in FRONT_DESK_TRANSITIONS:
+            raise ValidationError(
+                _("Unknown front desk operation: %s", transition))
+        errors = self._get_front_desk_errors(transition)
+        bookings = self.filtered(lambda booking: booking not in errors)
+        bookings._apply_front_desk_transition(transition)
+        return {
+            'processed': bookings.ids,
+            'errors': [{'id': booking.id, 'name': booking.name,
+                        'message': message}
+                       for booking, message in errors.items()],
+        }
+
+    def action_front_desk(self, transition):
+        """Server action processing the selected bookings, see
+        process_front_desk_list"""
+        result = self.process_front_desk_list(transition)
+        message = _("%s booking(s) processed.", len(result['processed']))
+        if result['errors']:
+            message = "%s\n%s" % (message, "\n".join(
+                error['message'] for error in result['errors']))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'warning' if result['errors'] else 'success',
+                'message': message,
+                'sticky': bool(result['errors']),
+                'next': {'type': 'ir.actions.act_window_close'},
             }
+        }
 
     def get_details(self):
         """ Returns different counts for displaying in dashboard"""
-        today = datetime.today()
-        tz_name = self.env.user.tz
-        today_utc = pytz.timezone('UTC').localize(today,
-                                                  is_dst=False)
-        context_today = today_utc.astimezone(pytz.timezone(tz_name))
-        total_room = self.env['hotel.room'].search_count([])
-        check_in = self.env['room.booking'].search_count(
-            [('state', '=', 'check_in')])
-        available_room = self.env['hotel.room'].search(
-            [('status', '=', 'available')])
-        reservation = self.env['room.booking'].search_count(
-            [('state', '=', 'reserved')])
-        check_outs = self.env['room.booking'].search([])
-        check_out = 0
-        staff = 0
-        for rec in check_outs:
-            for room in rec.room_line_ids:
-                if room.checkout_date.date() == context_today.date():
-                    check_out += 1
-            """staff"""
-            staff = self.env['res.users'].search_count(
-                [('groups_id', 'in',
-                  [self.env.ref('hotel_management_odoo.hotel_group_admin').id,
-                   self.env.ref(
-                       'hotel_management_odoo.cleaning_team_group_head').id,
-                   self.env.ref(
-                       'hotel_management_odoo.cleaning_team_group_user').id,
-                   self.env.ref(
-                       'hotel_management_odoo.hotel_group_reception').id,
-                   self.env.ref(
-                       'hotel_management_odoo.maintenance_team_group_leader').id,
-                   self.env.ref(
-                       'hotel_management_odoo.maintenance_team_group_user').id
-                   ])])
-        total_vehicle = self.env['fleet.vehicle.model'].search_count([])
-        available_vehicle = total_vehicle - self.env[
-            'fleet.booking.line'].search_count(
-            [('state', '=', 'check_in')])
-        total_event = self.env['event.event'].search_count([])
-        pending_event = self.env['event.event'].search([])
-        pending_events = 0
-        today_events = 0
-        for pending in pending_event:
-            if pending.date_end >= fields.datetime.now():
-                pending_events += 1
-            if pending.date_end.date() == fields.date.today():
-                today_events += 1
-        food_items = self.env['lunch.product'].search_count([])
-        food_order = len(self.env['food.booking.line'].search([]).filtered(
-            lambda r: r.booking_id.state not in ['check_out', 'cancel',
-                                                 'done']))
-        """total Revenue"""
-        total_revenue = 0
-        today_revenue = 0
-        pending_payment = 0
-        for rec in self.env['account.move'].search(
-                [('payment_state', '=', 'paid')]):
-            if rec.ref:
-                if 'BOOKING' in rec.ref:
-                    total_revenue += rec.amount_total
-                    if rec.date == fields.date.today():
-                        today_revenue += rec.amount_total
-        for rec in self.env['account.move'].search(
-                [('payment_state', '=', 'not_paid')]):
-            if rec.ref:
-                if 'BOOKING' in rec.ref:
-                    pending_payment += rec.amount_total
-        return {
-            'total_room': total_room,
-            'available_room': len(available_room),
-            'staff': staff,
-            'check_in': check_in,
-            'reservation': reservation,
-            'check_out': check_out,
-            'total_vehicle': total_vehicle,
-            'available_vehicle': available_vehicle,
-            'total_event': total_event,
-            'today_events': today_events,
-            'pending_events': pending_events,
-            'food_items': food_items,
-            'food_order': food_order,
-            'total_revenue': round(total_revenue, 2),
-            'today_revenue': round(today_revenue, 2),
-            'pending_payment': round(pending_payment, 2),
-            'currency_symbol': self.env.user.company_id.currency_id.symbol,
-            'currency_position': self.env.user.company_id.currency_id.position
-        }
\ No newline at end of file
+        return self.env['hotel.dashboard'].get_stats()
@@ -19,8 +19,17 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
+import logging
+import psycopg2
+
 from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# Booking states in which a room line blocks the room for its period.
+ROOM_BLOCKING_STATES = ('reserved', 'check_in')
 
 
 class RoomBookingLine(models.Model):
@@ -28,6 +37,29 @@ class RoomBookingLine(models.Model):
     _name = "room.booking.line"
     _description = "Hotel Folio Line"
     _rec_name = 'room_id'
+    _sql_constraints = [
+        ('checkout_after_checkin', 'CHECK (checkout_date >= checkin_date)',
+         'Checkout must be greater or equal checkin date'),
+    ]
+
+    def init(self):
+        """Index the stay period of every line as a half-open tsrange so
+        overlap lookups on a room are answered by a GiST index scan instead
+        of a full scan of the bookings. The room column is part of the
+        index when the btree_gist extension is available."""
+        period = "tsrange(checkin_date, checkout_date, '[)')"
+        expressions = [period]
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+            expressions = ['room_id', period]
+        except psycopg2.Error as error:
+            _logger.warning(
+                "btree_gist extension is not available (%s), the stay "
+                "period index of room.booking.line is built without the "
+                "room column", error)
+        create_index(self.env.cr, 'room_booking_line_room_period_index',
+                     self._table, expressions, method='gist')
 
     @tools.ormcache()
     def _set_default_uom_id(self):
@@ -89,6 +121,31 @@ class RoomBookingLine(models.Model):
                                           help="If True, then Booking Line "
                                                "will be visible")
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidates the dashboard counters"""
+        self.env['hotel.dashboard']._invalidate_stats()
+        return super().unlink()
+
+    @api.constrains("checkin_date", "checkout_date")
+    def _check_checkout_date(self):
+        """A line must not end before it starts, its stay period could not
+        be indexed as a tsrange"""
+        for line in self:
+            if line.checkout_date < line.checkin_date:
+                raise ValidationError(
+                    _("Checkout must be greater or equal checkin date"))
+
     @api.onchange("checkin_date", "checkout_date")
     def _onchange_checkin_date(self):
         """When you change checkin_date or checkout_date it will check
@@ -140,32 +197,70 @@ class RoomBookingLine(models.Model):
             },
         )
 
+    @api.model
+    def _find_room_conflicts(self, windows):
+        """Return the requested periods for which the room is not free.
+
+        :param windows: list of ``(line_id, room_id, checkin_date,
+            checkout_date)`` tuples, each period being treated as
+            ``[checkin, checkout)``; ``line_id`` is the saved line the period
+            belongs to, if any, and is never reported as its own conflict
+        :return: dict mapping the index of each conflicting window to the
+            folio number of a booking that already holds the room
+        """
+        requests = [(index, line_id or 0, room_id, checkin, checkout)
+                    for index, (line_id, room_id, checkin, checkout)
+                    in enumerate(windows)
+                    if room_id and checkin and checkout
+                    and checkin <= checkout]
+        if not requests:
+            return {}
+        self.flush_model(['room_id', 'checkin_date', 'checkout_date',
+                          'booking_id'])
+        self.env['room.booking'].flush_model(['state', 'name'])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (req.idx) req.idx, booking.name
+              FROM unnest(%s::int[], %s::int[], %s::int[], %s::timestamp[],
+                          %s::timestamp[])
+                   AS req(idx, line_id, room_id, checkin_date,
+                          checkout_date)
+              JOIN room_booking_line line
+                ON line.room_id = req.room_id
+               AND line.id != req.line_id
+               AND tsrange(line.checkin_date, line.checkout_date, '[)')
+                   && tsrange(req.checkin_date, req.checkout_date, '[)')
+              JOIN room_booking booking ON booking.id = line.booking_id
+             WHERE booking.state IN %s
+        """, [list(column) for column in zip(*requests)]
+              + [ROOM_BLOCKING_STATES])
+        return dict(self.env.cr.fetchall())
+
+    def _get_room_conflicts(self):
+        """Return the lines whose room is already held by a reserved or
+        checked-in booking for an overlapping period, mapped to the folio
+        number of that booking."""
+        lines = list(self)
+        conflicts = self._find_room_conflicts(
+            [(line._origin.id, line.room_id.id, line.checkin_date,
+              line.checkout_date) for line in lines])
+        return {lines[index]: folio for index, folio in conflicts.items()}
+
+    def _check_room_availability(self):
+        """Raise a ValidationError if a room of these lines is already held by
+        another reserved or checked-in booking for an overlapping period."""
+        conflicts = self._get_room_conflicts()
+        if conflicts:
+            rooms = self.browse().union(*conflicts).room_id
+            raise ValidationError(
+                _("Sorry, You cannot create a reservation for this date "
+                  "since it overlaps with another reservation..!! "
+                  "(%s)", ", ".join(rooms.mapped('name'))))
+
     @api.onchange('checkin_date', 'checkout_date', 'room_id')
     def onchange_checkin_date(self):
         """On change of check-in date, check-out date, or room ID,
            this method validates if the selected room is available
-           for the given dates. It searches for existing bookings
-           in the 'reserved' or 'check_in' state and checks for date
-           conflicts. If a conflict is found, a ValidationError is raised."""
-        records = self.env['room.booking'].search(
-            [('state', 'in', ['reserved', 'check_in'])])
-        for rec in records:
-            rec_room_id = rec.room_line_ids.room_id
-            rec_checkin_date = rec.room_line_ids.checkin_date
-            rec_checkout_date = rec.room_line_ids.checkout_date
-            if rec_room_id and rec_checkin_date and rec_checkout_date:
-                # Check for conflicts with existing room lines
-                for line in self:
-                    if line.id != rec.id and line.room_id == rec_room_id:
-                        # Check if the dates overlap
-                        if (rec_checkin_date <= line.checkin_date <= rec_checkout_date or
-                                rec_checkin_date <= line.checkout_date <= rec_checkout_date):
-                            raise ValidationError(
-                                _("Sorry, You cannot create a reservation for "
-                                  "this date since it overlaps with another "
-                                  "reservation..!!"))
-                        if rec_checkout_date <= line.checkout_date and rec_checkin_date >= line.checkin_date:
-                            raise ValidationError(
-                                "Sorry You cannot create a reservation for this"
-                                "date due to an existing reservation between "
-                                "this date")
+           for the given dates against the bookings in the 'reserved'
+           or 'check_in' state. If a conflict is found, a ValidationError
+           is raised."""
+        self._check_room_availability()
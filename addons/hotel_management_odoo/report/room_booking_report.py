@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: ADARSH K (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from odoo import api, models
+
+
+class RoomBookingReport(models.AbstractModel):
+    """Values of the Room Booking pdf report"""
+    _name = "report.hotel_management_odoo.report_room_booking"
+    _description = "Room Booking Report"
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """The rows are read by the room.booking.detail wizard while the
+        report is rendered. The wizard filters come from the report data;
+        when printed from the bookings, the selected bookings are used."""
+        if data and data.get("options") is not None:
+            options = data["options"]
+            wizard = self.env["room.booking.detail"].new({
+                "checkin": options.get("checkin"),
+                "checkout": options.get("checkout"),
+                "room_id": options.get("room_id"),
+            })
+            rows = wizard._iter_report_rows()
+        else:
+            rows = self.env["room.booking.detail"].new(
+                {})._iter_report_rows(booking_ids=docids or [])
+        return {
+            "doc_ids": docids,
+            "booking": rows,
+        }
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: ADARSH K (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from datetime import datetime, timedelta
+from odoo import Command
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+class HotelBookingCommon(AccountTestInvoicingCommon):
+    """Rooms, services, vehicles and events shared by the booking tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pricelist = cls.env['product.pricelist'].create({
+            'name': 'Hotel Pricelist',
+            'currency_id': cls.env.company.currency_id.id,
+        })
+        cls.room_101, cls.room_102 = cls.env['hotel.room'].create([{
+            'name': 'Suite',
+            'list_price': 100.0,
+            'num_person': 2,
+            'taxes_ids': [Command.clear()],
+        }, {
+            'name': 'Suite',
+            'list_price': 150.0,
+            'num_person': 2,
+            'taxes_ids': [Command.clear()],
+        }])
+        cls.service = cls.env['hotel.service'].create({
+            'name': 'Laundry',
+            'unit_price': 12.0,
+            'taxes_ids': [Command.clear()],
+        })
+        cls.vehicle = cls.env['fleet.vehicle.model'].create({
+            'name': 'Shuttle',
+            'brand_id': cls.env['fleet.vehicle.model.brand'].create({
+                'name': 'Hotel Fleet',
+            }).id,
+            'price_per_km': 2.0,
+        })
+        cls.event = cls.env['event.event'].create({
+            'name': 'Gala Dinner',
+            'date_begin': datetime(2024, 6, 1, 18, 0),
+            'date_end': datetime(2024, 6, 1, 23, 0),
+        })
+        cls.ticket = cls.env['product.product'].create({
+            'name': 'Gala Ticket',
+            'type': 'service',
+            'lst_price': 40.0,
+            'taxes_id': [Command.clear()],
+        })
+        cls.checkin = datetime(2024, 6, 1, 12, 0)
+
+    @classmethod
+    def _create_booking(cls, rooms, **lines):
+        """Creates a draft booking of the given rooms for two days, the
+        other booking lines are given as lists of values per line field"""
+        vals = {
+            'partner_id': cls.partner_a.id,
+            'user_id': cls.partner_a.id,
+            'pricelist_id': cls.pricelist.id,
+            'room_line_ids': [Command.create({
+                'room_id': room.id,
+                'checkin_date': cls.checkin,
+                'checkout_date': cls.checkin + timedelta(days=2),
+                'uom_qty': 2,
+            }) for room in rooms],
+        }
+        for field_name, line_vals in lines.items():
+            vals[field_name] = [Command.create(line) for line in line_vals]
+        return cls.env['room.booking'].create(vals)
+
+    def _get_invoiced(self, booking):
+        """Returns the invoiced quantity of the booking keyed by
+        (product_type, name, price_unit)"""
+        invoiced = {}
+        for line in self.env['account.move'].search(
+                [('ref', '=', booking.name)]).invoice_line_ids:
+            key = (line.product_type, line.name, line.price_unit)
+            invoiced[key] = invoiced.get(key, 0.0) + line.quantity
+        return invoiced
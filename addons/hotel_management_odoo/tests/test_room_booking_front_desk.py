@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: ADARSH K (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from .common import HotelBookingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestRoomBookingFrontDesk(HotelBookingCommon):
+    """Arrival and departure lists are processed in one go, the bookings
+    which cannot be processed are reported and left untouched"""
+
+    def test_check_in_list(self):
+        """All the bookings of the list are checked in and their rooms are
+        occupied"""
+        bookings = self._create_booking(self.room_101) | \
+            self._create_booking(self.room_102)
+        result = bookings.process_front_desk_list('check_in')
+        self.assertEqual(result['processed'], bookings.ids)
+        self.assertFalse(result['errors'])
+        self.assertEqual(set(bookings.mapped('state')), {'check_in'})
+        self.assertEqual(set((self.room_101 | self.room_102).mapped('status')),
+                         {'occupied'})
+
+    def test_check_out_releases_rooms(self):
+        """Checked out bookings give their rooms back"""
+        booking = self._create_booking(self.room_101)
+        booking.process_front_desk_list('check_in')
+        result = booking.process_front_desk_list('check_out')
+        self.assertEqual(result['processed'], booking.ids)
+        self.assertEqual(booking.state, 'check_out')
+        self.assertEqual(self.room_101.status, 'available')
+        self.assertTrue(self.room_101.is_room_avail)
+
+    def test_invalid_bookings_are_reported(self):
+        """Bookings in a wrong state or without rooms are reported, the
+        others are processed"""
+        checked_out = self._create_booking(self.room_101)
+        checked_out.process_front_desk_list('check_in')
+        checked_out.process_front_desk_list('check_out')
+        without_room = self._create_booking(self.env['hotel.room'])
+        draft = self._create_booking(self.room_102)
+        result = (checked_out | without_room | draft).process_front_desk_list(
+            'reserve')
+        self.assertEqual(result['processed'], draft.ids)
+        self.assertEqual({error['id'] for error in result['errors']},
+                         {checked_out.id, without_room.id})
+        self.assertEqual(checked_out.state, 'check_out')
+        self.assertEqual(without_room.state, 'draft')
+        self.assertEqual(draft.state, 'reserved')
+        self.assertEqual(self.room_101.status, 'available')
+
+    def test_held_room_wins(self):
+        """A draft booking cannot take a room held by a reserved booking of
+        the same list"""
+        reserved = self._create_booking(self.room_101)
+        reserved.process_front_desk_list('reserve')
+        draft = self._create_booking(self.room_101)
+        result = (draft | reserved).process_front_desk_list('check_in')
+        self.assertEqual(result['processed'], reserved.ids)
+        self.assertEqual([error['id'] for error in result['errors']],
+                         draft.ids)
+        self.assertEqual(reserved.state, 'check_in')
+        self.assertEqual(draft.state, 'draft')
+
+    def test_competing_draft_bookings(self):
+        """Only one of two draft bookings of the same room is checked in"""
+        bookings = self._create_booking(self.room_101) | \
+            self._create_booking(self.room_101)
+        result = bookings.process_front_desk_list('check_in')
+        self.assertEqual(len(result['processed']), 1)
+        self.assertEqual(len(result['errors']), 1)
+        self.assertEqual(sorted(bookings.mapped('state')),
+                         ['check_in', 'draft'])
+
+    def test_unknown_transition(self):
+        """Unknown operations are refused"""
+        booking = self._create_booking(self.room_101)
+        with self.assertRaises(ValidationError):
+            booking.process_front_desk_list('done')
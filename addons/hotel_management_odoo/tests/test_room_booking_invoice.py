@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: ADARSH K (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from odoo import Command
+from odoo.tests import tagged
+from .common import HotelBookingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestRoomBookingInvoice(HotelBookingCommon):
+    """Only the booking lines which are not invoiced yet are invoiced"""
+
+    def test_same_name_different_prices(self):
+        """Rooms sharing a name are invoiced at their own price"""
+        booking = self._create_booking(self.room_101 | self.room_102)
+        booking.action_invoice()
+        self.assertEqual(self._get_invoiced(booking), {
+            ('room', 'Suite', 100.0): 2.0,
+            ('room', 'Suite', 150.0): 2.0,
+        })
+        self.assertFalse(booking._prepare_invoice_booking_list())
+
+    def test_reinvoice_after_partial_invoice(self):
+        """Invoicing again only invoices the added lines and quantities"""
+        booking = self._create_booking(self.room_101)
+        booking.action_invoice()
+        booking.write({'service_line_ids': [Command.create({
+            'service_id': self.service.id,
+            'uom_qty': 3,
+        })]})
+        booking.room_line_ids.uom_qty = 5
+        self.assertEqual(booking._prepare_invoice_booking_list(), [{
+            'name': 'Suite',
+            'quantity': 3.0,
+            'price_unit': 100.0,
+            'product_type': 'room',
+        }, {
+            'name': 'Laundry',
+            'quantity': 3.0,
+            'price_unit': 12.0,
+            'product_type': 'service',
+        }])
+        booking.action_invoice()
+        self.assertEqual(self._get_invoiced(booking), {
+            ('room', 'Suite', 100.0): 5.0,
+            ('service', 'Laundry', 12.0): 3.0,
+        })
+        self.assertFalse(booking._prepare_invoice_booking_list())
+        self.assertFalse(booking.action_invoice())
+
+    def test_service_fleet_event_lines(self):
+        """Service, vehicle and event lines are invoiced with their type"""
+        booking = self._create_booking(self.room_101, service_line_ids=[{
+            'service_id': self.service.id,
+            'uom_qty': 1,
+        }], vehicle_line_ids=[{
+            'fleet_id': self.vehicle.id,
+            'uom_qty': 30,
+        }], event_line_ids=[{
+            'event_id': self.event.id,
+            'ticket_id': self.ticket.id,
+            'uom_qty': 2,
+        }])
+        booking.action_invoice()
+        self.assertEqual(self._get_invoiced(booking), {
+            ('room', 'Suite', 100.0): 2.0,
+            ('service', 'Laundry', 12.0): 1.0,
+            ('fleet', 'Shuttle', 2.0): 30.0,
+            ('event', 'Gala Dinner', 40.0): 2.0,
+        })
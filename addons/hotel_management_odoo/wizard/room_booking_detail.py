@@ -19,8 +19,8 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
-import io
 import json
+import uuid
 from odoo import fields, models, _
 from odoo.exceptions import ValidationError
 from odoo.tools import json_default
@@ -30,6 +30,9 @@ try:
 except ImportError:
     import xlsxwriter
 
+# Number of bookings read at once when building the report rows
+REPORT_CHUNK_SIZE = 2000
+
 
 class RoomBookingWizard(models.TransientModel):
     """Pdf Report for room Booking"""
@@ -43,75 +46,125 @@ class RoomBookingWizard(models.TransientModel):
                               help="Choose The Room")
 
     def action_room_booking_pdf(self):
-        """Button action_room_booking_pdf function"""
+        """Button action_room_booking_pdf function. Only the filters are
+        sent, the report model reads the rows while rendering."""
         data = {
-            "booking": self.generate_data(),
+            "options": json.loads(json.dumps(self._get_report_options(),
+                                             default=json_default)),
         }
         return self.env.ref(
             "hotel_management_odoo.action_report_room_booking"
         ).report_action(self, data=data)
 
     def action_room_booking_excel(self):
-        """Button action for creating Room Booking Excel report"""
-        data = {
-            "booking": self.generate_data(),
-        }
+        """Button action for creating Room Booking Excel report. Only the
+        filters are sent, the rows are read while the file is written."""
         return {
             "type": "ir.actions.report",
             "data": {
                 "model": "room.booking.detail",
-                "options": json.dumps(data, default=json_default),
+                "options": json.dumps(self._get_report_options(),
+                                      default=json_default),
                 "output_format": "xlsx",
                 "report_name": "Excel Report",
             },
             "report_type": "xlsx",
         }
 
-    def generate_data(self):
-        """Generate data to be printed in the report"""
-        domain = []
-        room_list = []
+    def _get_report_options(self):
+        """Returns the filters of the wizard, as sent to the xlsx report"""
         if self.checkin and self.checkout:
             if self.checkin > self.checkout:
                 raise ValidationError(
                     _("Check-in date should be less than Check-out date")
                 )
+        return {
+            "checkin": self.checkin,
+            "checkout": self.checkout,
+            "room_id": self.room_id.id,
+        }
+
+    def generate_data(self):
+        """Generate data to be printed in the report"""
+        return list(self._iter_report_rows())
+
+    def _iter_report_rows(self, booking_ids=None):
+        """Yields the report rows, one per booked room, from a single query
+        joining the bookings, their lines and the rooms. The filters and the
+        expansion per room are done in SQL and the rows are fetched from a
+        server side cursor by chunks of REPORT_CHUNK_SIZE, so that memory
+        does not grow with the number of bookings. The record rules of
+        room.booking restrict the bookings like the ORM would.
+
+        :param booking_ids: optional list of bookings to restrict the report
+            to, in addition to the wizard filters
+        """
+        self._get_report_options()
+        self.env["room.booking"].check_access("read")
+        self.env["room.booking"].flush_model(
+            ["partner_id", "name", "checkin_date", "checkout_date"])
+        self.env["room.booking.line"].flush_model(["booking_id", "room_id"])
+        self.env["hotel.room"].flush_model(["name"])
+        self.env["res.partner"].flush_model(["complete_name"])
+        params = [self.env.lang or "en_US"]
+        # Bookings readable by the user, the record rules apply to the join
+        booking_query = self.env["room.booking"]._where_calc(
+            [], active_test=False)
+        self.env["room.booking"]._apply_ir_rules(booking_query, "read")
+        booking_subselect = booking_query.subselect()
+        conditions = ["booking.id IN (%s)" % booking_subselect.code]
+        params.extend(booking_subselect.params)
         if self.checkin:
-            domain.append(
-                ("checkin_date", ">=", self.checkin),
-            )
+            conditions.append("booking.checkin_date >= %s")
+            params.append(self.checkin)
         if self.checkout:
-            domain.append(
-                ("checkout_date", "<=", self.checkout),
-            )
-        room_booking = self.env["room.booking"].search_read(
-            domain=domain,
-            fields=["partner_id", "name", "checkin_date", "checkout_date"],
-        )
-        for rec in room_booking:
-            rooms = (
-                self.env["room.booking"]
-                .browse(rec["id"])
-                .room_line_ids.room_id.mapped("name")
-            )
-            rec["partner_id"] = rec["partner_id"][1]
-            for room in rooms:
-                if self.room_id:
-                    if self.room_id.name == room:
-                        rec_copy = rec.copy()
-                        rec_copy["room"] = room  # Ensure this key is added
-                        room_list.append(rec_copy)
-                else:
-                    rec_copy = rec.copy()
-                    rec_copy["room"] = room  # Ensure this key is added
-                    room_list.append(rec_copy)
-
-        return room_list
+            conditions.append("booking.checkout_date <= %s")
+            params.append(self.checkout)
+        if self.room_id:
+            conditions.append("line.room_id = %s")
+            params.append(self.room_id.id)
+        if booking_ids is not None:
+            conditions.append("booking.id = ANY(%s)")
+            params.append(list(booking_ids))
+        cursor_name = "room_booking_report_%s" % uuid.uuid4().hex
+        query = """
+            DECLARE {cursor} NO SCROLL CURSOR FOR
+            SELECT booking.id,
+                   partner.complete_name AS partner_id,
+                   booking.name,
+                   booking.checkin_date,
+                   booking.checkout_date,
+                   COALESCE(room.name->>%s, room.name->>'en_US') AS room
+              FROM room_booking booking
+              JOIN room_booking_line line ON line.booking_id = booking.id
+              JOIN hotel_room room ON room.id = line.room_id
+              LEFT JOIN res_partner partner ON partner.id = booking.partner_id
+             WHERE {conditions}
+             ORDER BY booking.id, line.id
+        """.format(cursor=cursor_name, conditions=" AND ".join(conditions))
+        self.env.cr.execute(query, params)
+        try:
+            while True:
+                self.env.cr.execute("FETCH FORWARD %s FROM %s" % (
+                    REPORT_CHUNK_SIZE, cursor_name))
+                rows = self.env.cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        except GeneratorExit:
+            self.env.cr.execute("CLOSE %s" % cursor_name)
+            raise
+        self.env.cr.execute("CLOSE %s" % cursor_name)
 
-    def get_xlsx_report(self, data, response):
-        """Organizing xlsx report"""
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+    def get_xlsx_report(self, options, output):
+        """Organizing xlsx report. The workbook is written in constant memory
+        mode to the file object ``output``, row by row."""
+        wizard = self.new({
+            "checkin": options.get("checkin"),
+            "checkout": options.get("checkout"),
+            "room_id": options.get("room_id"),
+        })
+        workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
         sheet = workbook.add_worksheet()
         cell_format = workbook.add_format(
             {"font_size": "14px", "bold": True, "align": "center",
@@ -136,16 +189,15 @@ class RoomBookingWizard(models.TransientModel):
         row = 2
         column = 0
         value = 1
-        for i in data["booking"]:
+        for i in wizard._iter_report_rows():
             sheet.write(row, column, value, body)
             sheet.write(row, column + 1, i["partner_id"], body)
             sheet.write(row, column + 2, i["room"], body)
-            sheet.write(row, column + 3, i["checkin_date"], body)
-            sheet.write(row, column + 4, i["checkout_date"], body)
+            sheet.write(row, column + 3,
+                        fields.Datetime.to_string(i["checkin_date"]), body)
+            sheet.write(row, column + 4,
+                        fields.Datetime.to_string(i["checkout_date"]), body)
             sheet.write(row, column + 5, i["name"], body)
             row = row + 1
             value = value + 1
         workbook.close()
-        output.seek(0)
-        response.stream.write(output.read())
-        output.close()
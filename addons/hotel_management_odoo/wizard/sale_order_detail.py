@@ -19,7 +19,6 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
-import io
 import json
 from odoo import fields, models, _
 from odoo.exceptions import ValidationError
@@ -30,6 +29,9 @@ try:
 except ImportError:
     import xlsxwriter
 
+# Number of bookings read at once when building the report rows
+REPORT_CHUNK_SIZE = 2000
+
 
 class SaleOrderWizard(models.TransientModel):
     """Pdf Report for Sale Order"""
@@ -49,14 +51,12 @@ class SaleOrderWizard(models.TransientModel):
             self, data=data)
 
     def action_sale_order_excel(self):
-        """Button action for creating Sale Order Report"""
-        data = {
-            'booking': self.generate_data(),
-        }
+        """Button action for creating Sale Order Report. Only the filters
+        are sent, the rows are read while the file is written."""
         return {
             'type': 'ir.actions.report',
             'data': {'model': 'sale.order.detail',
-                     'options': json.dumps(data,
+                     'options': json.dumps(self._get_report_options(),
                                            default=json_default),
                      'output_format': 'xlsx',
                      'report_name': 'Excel Report',
@@ -64,32 +64,54 @@ class SaleOrderWizard(models.TransientModel):
             'report_type': 'xlsx',
         }
 
-    def generate_data(self):
-        """Generate data to be printed in the report"""
-        domain = []
+    def _get_report_options(self):
+        """Returns the filters of the wizard, as sent to the xlsx report"""
         if self.checkin and self.checkout:
             if self.checkin > self.checkout:
                 raise ValidationError(_(
                     'Check-in date should be less than Check-out date'))
+        return {
+            'checkin': self.checkin,
+            'checkout': self.checkout,
+        }
+
+    def generate_data(self):
+        """Generate data to be printed in the report"""
+        return list(self._iter_report_rows())
+
+    def _iter_report_rows(self):
+        """Yields the report rows, reading the bookings by chunks of
+        REPORT_CHUNK_SIZE records so that memory does not grow with the
+        number of bookings"""
+        domain = []
+        self._get_report_options()
         if self.checkin:
             domain.append(('checkin_date', '>=', self.checkin), )
         if self.checkout:
             domain.append(('checkout_date', '<=', self.checkout), )
-        room_booking = self.env['room.booking'].search_read(domain=domain,
-                                                            fields=[
-                                                                'partner_id',
-                                                                'name',
-                                                                'checkin_date',
-                                                                'checkout_date',
-                                                                'amount_total'])
-        for rec in room_booking:
-            rec['partner_id'] = rec['partner_id'][1]
-        return room_booking
+        last_id = 0
+        while True:
+            room_booking = self.env['room.booking'].search_read(
+                domain=domain + [('id', '>', last_id)],
+                fields=['partner_id', 'name', 'checkin_date',
+                        'checkout_date', 'amount_total'],
+                order='id', limit=REPORT_CHUNK_SIZE)
+            if not room_booking:
+                break
+            last_id = room_booking[-1]['id']
+            for rec in room_booking:
+                rec['partner_id'] = rec['partner_id'][1]
+                yield rec
+            self.env['room.booking'].invalidate_model()
 
-    def get_xlsx_report(self, data, response):
-        """Organizing xlsx report"""
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    def get_xlsx_report(self, options, output):
+        """Organizing xlsx report. The workbook is written in constant memory
+        mode to the file object ``output``, row by row."""
+        wizard = self.new({
+            'checkin': options.get('checkin'),
+            'checkout': options.get('checkout'),
+        })
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
         sheet = workbook.add_worksheet()
         cell_format = workbook.add_format(
             {'font_size': '14px', 'bold': True, 'align': 'center',
@@ -112,17 +134,16 @@ class SaleOrderWizard(models.TransientModel):
         row = 2
         column = 0
         value = 1
-        for i in data['booking']:
+        for i in wizard._iter_report_rows():
             sheet.write(row, column, value, body)
             sheet.write(row, column + 1, i['partner_id'], body)
-            sheet.write(row, column + 2, i['checkin_date'], body)
-            sheet.write(row, column + 3, i['checkout_date'], body)
+            sheet.write(row, column + 2,
+                        fields.Datetime.to_string(i['checkin_date']), body)
+            sheet.write(row, column + 3,
+                        fields.Datetime.to_string(i['checkout_date']), body)
             sheet.write(row, column + 4, i['name'], body)
             sheet.write(row, column + 5, "{:.2f}".format(i['amount_total']),
                         body)
             row = row + 1
             value = value + 1
         workbook.close()
-        output.seek(0)
-        response.stream.write(output.read())
-        output.close()
@@ -6,7 +6,7 @@
     "name": """Analytic Data Query""",
     "summary": """IZI Module to Handle Data Query. Dependency For IZI Dashboard by IZI""",
     "category": "Reporting",
-    "version": "18.0.5.0.2",
+    "version": "18.0.5.0.3",
     "development_status": "Alpha",  # Options: Alpha|Beta|Production/Stable|Mature
     "auto_install": True,
     "installable": True,
@@ -36,6 +36,7 @@
         # data
         'data/izi_table_field_mapping_db_odoo.xml',
         'data/izi_analysis_filter_operator_db_odoo.xml',
+        'data/ir_config_parameter.xml',
 
         # global action
         # 'views/action/action.xml',
@@ -44,6 +45,7 @@
         'views/common/izi_data_source.xml',
         'views/common/izi_table.xml',
         'views/common/izi_analysis.xml',
+        'views/common/izi_analysis_profile.xml',
         'views/common/ir_attachment.xml',
         'views/common/ir_cron.xml',
         'views/common/izi_kpi.xml',
@@ -37,18 +37,24 @@ class ReportController(http.Controller):
 
         # sheet.write(0, 0, '%s REPORT %s TO %s' % (name.upper(), date_from, date_to), title_style)
         
-        data = []
         data_kwargs = {'is_excel_export': True}
+        if analysis._is_columnar_supported():
+            data_kwargs['result_format'] = 'columnar'
         if kwargs.get('filters'):
             filters = json.loads(kwargs.get('filters'))
             data_kwargs['filters'] = filters
         if kwargs.get('allowed_company_ids'):
             data_kwargs['allowed_company_ids'] = json.loads(kwargs.get('allowed_company_ids'))
         result = analysis.get_analysis_data_dashboard(**data_kwargs)
-        data = result.get('raw_data')
-        fields = []
-        if not fields and data and data[0].keys():
-            fields = list(data[0].keys())
+        # Columnar Result, The Sheet Is Written Column By Column From The Lists Of Values
+        fields = result.get('fields') or []
+        columns = result.get('columns')
+        if columns is None:
+            data = result.get('raw_data') or []
+            fields = []
+            if data and data[0].keys():
+                fields = list(data[0].keys())
+            columns = [[dt.get(field) for dt in data] for field in fields]
         
         replace_title = {
         }
@@ -68,16 +74,9 @@ class ReportController(http.Controller):
             sheet.set_column(i, i, round(len(field)*1.5))
             i += 1
 
-        row = 1
-        for dt in data:
-            col = 0
-            for field in fields:
-                cell_value = ''
-                if field in dt and (dt[field] or dt[field] is 0):
-                    cell_value = str(dt[field])
-                sheet.write(row, col, cell_value, text_style)
-                col += 1
-            row += 1
+        for col, column in enumerate(columns):
+            cell_values = [str(value) if (value or value == 0) and value is not False else '' for value in column]
+            sheet.write_column(1, col, cell_values, text_style)
         workbook.close()
         output.seek(0)
         response.stream.write(output.read())
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+
+
+def migrate(cr, version):
+    # Result Cache Is Opt In, Existing Analyses Keep Reading Live Data
+    cr.execute('UPDATE izi_analysis SET cache_enabled = FALSE WHERE cache_enabled IS NOT FALSE')
+    # Data Frame Cache Of Direct Tables Is Opt In, Existing Tables Run Their Script On Every Call
+    cr.execute('UPDATE izi_table SET frame_cache_ttl = 0 WHERE frame_cache_ttl IS DISTINCT FROM 0')
+    # Profiling Is Opt In, Slow Executions Are Still Logged
+    cr.execute('UPDATE izi_analysis SET profile_enabled = FALSE WHERE profile_enabled IS NOT FALSE')
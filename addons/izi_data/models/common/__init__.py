@@ -5,6 +5,9 @@ from . import izi_tools
 from . import izi_data_source
 from . import izi_table
 from . import izi_analysis
+from . import izi_analysis_frame
+from . import izi_analysis_profile
+from . import base
 from . import db_odoo
 from . import ir_attachment
 from . import ir_cron
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+from odoo import models, api
+from .izi_analysis import invalidate_analysis_cache_on_commit
+
+
+class Base(models.AbstractModel):
+    _inherit = 'base'
+
+    # Outdate Cached Analysis Results Computed From The Written Model, Once Committed
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(Base, self).create(vals_list)
+        invalidate_analysis_cache_on_commit(self.env.cr, 'model', self._name)
+        return records
+
+    def write(self, vals):
+        res = super(Base, self).write(vals)
+        invalidate_analysis_cache_on_commit(self.env.cr, 'model', self._name)
+        return res
+
+    def unlink(self):
+        res = super(Base, self).unlink()
+        invalidate_analysis_cache_on_commit(self.env.cr, 'model', self._name)
+        return res
@@ -22,6 +22,22 @@ class IZIAnalysisDBOdoo(models.Model):
             'res_data': res_data,
         }
 
+    def get_analysis_rows_db_odoo(self, **kwargs):
+        self.ensure_one()
+        cursor = self.source_id.get_cursor_db_odoo()
+
+        try:
+            cursor.execute(kwargs.get('query'))
+        except Exception as e:
+            raise ValidationError(e)
+        res_fields = [column[0] for column in cursor.description]
+        res_rows = cursor.fetchall()
+        self.source_id.close_cursor_db_odoo(cursor)
+        return {
+            'res_fields': res_fields,
+            'res_rows': res_rows,
+        }
+
     def get_field_metric_format_db_odoo(self, **kwargs):
         self.ensure_one()
         query = '%s' % (kwargs.get('field_name'))
@@ -31,7 +31,20 @@ class ServerAction(models.Model):
             raise UserError('Action Not Found')
     
     def _run_action_code_multi(self, eval_context):
+        # Swap Refresh, The Code Loads Into The Shadow Tables And They Replace The Mart Tables Once It Succeeded
+        swap_tables = self.env['izi.table']
+        if eval_context.get('cron'):
+            swap_tables = eval_context.get('cron').table_ids.filtered(lambda t: t.is_stored and not t.is_direct and t.stored_option != 'materialized' and t.refresh_mode == 'swap' and t.store_table_name)
+        if swap_tables:
+            redirects = swap_tables.prepare_shadow_table(copy_data=True)
+            eval_context['izi'] = eval_context['izi'].with_context(izi_table_redirects=redirects)
+            if eval_context.get('izi_table'):
+                eval_context['izi_table'] = eval_context['izi_table'].with_context(izi_table_redirects=redirects)
         res = super(ServerAction, self)._run_action_code_multi(eval_context)
+        swap_tables.swap_shadow_table()
+        # The Code Of A Stored Table Scheduler Refreshes Its Mart Table
+        if eval_context.get('cron'):
+            eval_context.get('cron').table_ids.filtered(lambda t: t.is_stored and not t.is_direct).invalidate_analysis_cache()
         if eval_context.get('response'):
             return eval_context.get('response')
         # response = {
@@ -5,14 +5,21 @@ import pytz
 from odoo import models, fields, api, _
 from odoo.tools.safe_eval import safe_eval
 from odoo.exceptions import ValidationError, UserError
-from itertools import accumulate
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 from random import randint
 import pandas
 import json
 import re
-from collections import defaultdict
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+_logger = logging.getLogger(__name__)
 
 DEFAULT_DATA_SCRIPT = """
 response = {
@@ -33,6 +40,44 @@ response = {
 }
 """
 
+# Result Cache Of get_analysis_data
+# Entries Live In The Memory Of The Worker. They Expire By The TTL Of The Analysis, By LRU Order
+# Once ANALYSIS_CACHE_MAX_SIZE Is Reached, Or When A Model / Mart Table They Were Computed From Is Written
+# (Again After The Commit, For Models).
+# Writes Only Reach The Cache Of The Worker That Did Them, The TTL Bounds The Staleness Of The Others.
+ANALYSIS_CACHE_MAX_SIZE = 1000
+_analysis_cache = OrderedDict()
+_analysis_cache_generations = {}
+_analysis_cache_stats = {}
+_analysis_cache_lock = threading.Lock()
+
+# Concurrent Analyses Of get_analysis_data_batch, Each Holds A Database Connection While It Runs
+ANALYSIS_BATCH_MAX_WORKERS = 4
+# Kwargs Making get_analysis_data Write, Such Requests Are Not Run On The Read Only Cursors Of The Batch
+ANALYSIS_BATCH_WRITING_KWARGS = ('drilldown_level', 'drilldown_field')
+
+
+def invalidate_analysis_cache(dbname, source_type, source_name):
+    # Source Type Is 'model' (Odoo Model Name), 'table' (Mart Table Name) Or 'analysis' (Analysis ID)
+    key = (dbname, source_type, source_name)
+    if key in _analysis_cache_generations:
+        with _analysis_cache_lock:
+            _analysis_cache_generations[key] += 1
+
+
+def invalidate_analysis_cache_on_commit(cr, source_type, source_name):
+    # Outdate Now For The Current Transaction And Again Once Committed, Results Cached Meanwhile By Other
+    # Transactions Were Computed From The Previous Rows. Sources No Cached Analysis Uses Are Skipped Then
+    key = (cr.dbname, source_type, source_name)
+    invalidate_analysis_cache(*key)
+    keys = cr.postcommit.data.setdefault('izi.analysis.invalidate', set())
+    if not keys:
+        def invalidate():
+            for source in keys:
+                invalidate_analysis_cache(*source)
+        cr.postcommit.add(invalidate)
+    keys.add(key)
+
 class IZIAnalysisCategory(models.Model):
     _name = 'izi.analysis.category'
     _description = 'IZI Analysis Category'
@@ -111,6 +156,13 @@ class IZIAnalysis(models.Model):
     analysis_data_script = fields.Text('Analysis Data Script', related='server_action_id.code', readonly=False)
     is_ai = fields.Boolean('Generated By AI')
 
+    # Result Cache
+    cache_enabled = fields.Boolean('Cache Results', default=False,
+                                   help='Serve repeated calls from the result cache. Data read outside the ORM of this database can be up to the cache lifetime old.')
+    cache_ttl = fields.Integer('Cache Lifetime (Seconds)', default=60)
+    cache_hit_count = fields.Integer('Cache Hits', compute='_compute_cache_stats')
+    cache_miss_count = fields.Integer('Cache Misses', compute='_compute_cache_stats')
+
     # _sql_constraints = [
     #     ('name_table_unique', 'unique(name, table_id)', 'Analysis Name Already Exist.')
     # ]
@@ -229,6 +281,7 @@ class IZIAnalysis(models.Model):
 
     # Unlink
     def unlink(self):
+        self.action_clear_cache()
         res = super(IZIAnalysis, self).unlink()
         return res
     
@@ -335,6 +388,8 @@ class IZIAnalysis(models.Model):
             if vals.get('name') and analysis.method in ('query', 'table_view') and analysis.table_id:
                 analysis.table_id.name = vals.get('name')
         res = super(IZIAnalysis, self).write(vals)
+        for analysis in self:
+            invalidate_analysis_cache(self.env.cr.dbname, 'analysis', analysis.id)
         # for analysis in self:
         #     if not analysis.metric_ids:
         #         analysis._set_default_metric()
@@ -686,11 +741,125 @@ class IZIAnalysis(models.Model):
 
         self.query_preview = sqlparse.format(query, reindent=True, keyword_case='upper')
 
+    def _compute_cache_stats(self):
+        dbname = self.env.cr.dbname
+        for analysis in self:
+            hits, misses = _analysis_cache_stats.get((dbname, analysis.id), (0, 0))
+            analysis.cache_hit_count = hits
+            analysis.cache_miss_count = misses
+
+    def action_clear_cache(self):
+        dbname = self.env.cr.dbname
+        for analysis in self:
+            invalidate_analysis_cache(dbname, 'analysis', analysis.id)
+            _analysis_cache_stats.pop((dbname, analysis.id), None)
+        return True
+
+    def _is_analysis_data_cacheable(self, **kwargs):
+        self.ensure_one()
+        if not self.cache_enabled or self.cache_ttl <= 0:
+            return False
+        # Drill Down Rewrites The Drilldown Dimensions, Test And Domain Calls Return Something Else Than Data
+        if kwargs.get('drilldown_level') or 'test_analysis' in self._context or self._context.get('action_return_domain'):
+            return False
+        return True
+
+    def _get_analysis_config_signature(self):
+        self.ensure_one()
+        return [
+            [(metric.field_id.field_name, metric.calculation, metric.name_alias, metric.custom_query) for metric in self.metric_ids],
+            [(dimension.field_id.field_name, dimension.field_format, dimension.name_alias) for dimension in self.dimension_ids],
+            [(sort.field_id.field_name, sort.sort) for sort in self.sort_ids],
+            self.limit,
+            self.domain,
+            self.date_field_id.field_name,
+            self.date_format,
+            self.start_date,
+            self.end_date,
+        ]
+
+    def _get_analysis_cache_key(self, **kwargs):
+        # Returns The Cache Key And The Sources (Models, Mart Tables) The Result Depends On
+        # The Key Is A Fingerprint Of The Final SQL Or Domain, The Companies, The Language And The Timezone
+        self.ensure_one()
+        dbname = self.env.cr.dbname
+        params = copy.deepcopy(kwargs)
+        sources = [(dbname, 'analysis', self.id)]
+        if self.method in ('model', 'kpi'):
+            domain = self.with_context(action_return_domain=True).get_analysis_data_model(**copy.deepcopy(kwargs))
+            fingerprint = [self.model_id.model, domain, self._get_analysis_config_signature(), params, self.env.uid]
+            sources.append((dbname, 'model', self.model_id.model))
+        elif self.method in ('table_view', 'query', 'table') and self.table_id and self.table_id.is_direct:
+            fingerprint = [self.table_id.cron_id.code, self._get_analysis_config_signature(), params, self.env.uid]
+        elif self.method in ('table_view', 'query', 'table'):
+            queries = self.with_context(action_return_domain=True).get_analysis_data_query(**copy.deepcopy(kwargs))
+            fingerprint = [queries.get('query')]
+            for key in ('server_side', 'is_excel_export', 'pagination_limit', 'pagination_offset', 'result_format'):
+                fingerprint.append(params.get(key))
+            if self.table_id.is_stored and self.table_id.store_table_name:
+                sources.append((dbname, 'table', self.table_id.store_table_name))
+            if self.table_id.model_id:
+                sources.append((dbname, 'model', self.table_id.model_id.model))
+        else:
+            fingerprint = [self.server_action_id.code, params, self.env.uid]
+        company_ids = kwargs.get('allowed_company_ids') or self._context.get('allowed_company_ids') or self.env.companies.ids
+        fingerprint += [sorted(company_ids), self._context.get('lang'), self._context.get('tz')]
+        digest = hashlib.sha1(json.dumps(fingerprint, default=str, sort_keys=True).encode()).hexdigest()
+        return (dbname, self.id, digest), sources
+
+    def _is_columnar_result(self, **kwargs):
+        # Opt In With result_format='columnar', The Test Button Keeps The Rows For Its Sample
+        return kwargs.get('result_format') == 'columnar' and 'test_analysis' not in self._context
+
+    def _is_columnar_supported(self):
+        # Query Analyses Read The Cursor Tuples Of Stored Tables And Of Sources With get_analysis_rows_<type>,
+        # Other Sources Only Return Dicts
+        self.ensure_one()
+        if self.method not in ('table_view', 'query', 'table') or self.table_id.is_stored:
+            return True
+        return hasattr(self, 'get_analysis_rows_%s' % self.source_id.type)
+
+    def _get_analysis_columns_result(self, result, res_fields, res_columns):
+        # Columnar Response Returns One List Per Field Instead Of The Rows And Their Values
+        result.pop('data', None)
+        result.pop('values', None)
+        result['fields'] = res_fields
+        result['columns'] = res_columns
+        return result
+
     def get_analysis_data(self, **kwargs):
+        self.ensure_one()
+        if self.method == 'kpi' and self.kpi_id and self.kpi_auto_calculate:
+            self.kpi_id.action_calculate_value()
+        if not self._is_analysis_data_cacheable(**kwargs):
+            return self._get_analysis_data(**kwargs)
+
+        cache_key, sources = self._get_analysis_cache_key(**kwargs)
+        stats_key = (self.env.cr.dbname, self.id)
+        now = time.monotonic()
+        with _analysis_cache_lock:
+            stats = _analysis_cache_stats.setdefault(stats_key, [0, 0])
+            entry = _analysis_cache.get(cache_key)
+            if entry and entry[0] > now and all(
+                    _analysis_cache_generations.get(source) == generation for source, generation in entry[1].items()):
+                _analysis_cache.move_to_end(cache_key)
+                stats[0] += 1
+                return copy.deepcopy(entry[2])
+            stats[1] += 1
+            # Take The Generations Before Computing, A Write During The Computation Makes The Entry Outdated
+            generations = {source: _analysis_cache_generations.setdefault(source, 0) for source in sources}
+
+        result = self._get_analysis_data(**kwargs)
+        with _analysis_cache_lock:
+            _analysis_cache[cache_key] = (now + self.cache_ttl, generations, copy.deepcopy(result))
+            _analysis_cache.move_to_end(cache_key)
+            while len(_analysis_cache) > ANALYSIS_CACHE_MAX_SIZE:
+                _analysis_cache.popitem(last=False)
+        return result
+
+    def _get_analysis_data(self, **kwargs):
         self.ensure_one()
         if self.method in ('model', 'kpi'):
-            if self.method == 'kpi' and self.kpi_id and self.kpi_auto_calculate:
-                self.kpi_id.action_calculate_value()
             return self.get_analysis_data_model(**kwargs)
         elif self.method in ('table_view', 'query', 'table'):
             if self.table_id and self.table_id.is_direct:
@@ -699,24 +868,91 @@ class IZIAnalysis(models.Model):
         elif self.method in ('data_script'):
             return self.get_analysis_data_script(**kwargs)
     
+    @api.model
+    def get_analysis_data_batch(self, requests):
+        # Resolves The Data Of Several Analyses In One Call
+        # requests Is A List Of [analysis_id, kwargs]. Analyses Reading SQL Sources Run Concurrently, Each On Its Own
+        # Read Only Cursor, The Others (Model, KPI, Direct Table, Data Script) Run In This Transaction
+        # Every Result Comes With Its Duration In Seconds And An Error Message Instead Of The Data If It Failed
+        start = time.monotonic()
+        results = [False] * len(requests)
+        concurrent_requests = []
+        for index, (analysis_id, kwargs) in enumerate(requests):
+            analysis = self.browse(analysis_id)
+            if analysis.exists() and analysis._is_analysis_data_concurrent(kwargs or {}):
+                concurrent_requests.append((index, analysis_id, kwargs or {}))
+            else:
+                results[index] = self._get_analysis_data_timed(analysis_id, kwargs or {})
+
+        if len(concurrent_requests) > 1 and not self.env.registry.in_test_mode():
+            max_workers = min(ANALYSIS_BATCH_MAX_WORKERS, len(concurrent_requests))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._get_analysis_data_thread, self.env.cr.dbname, analysis_id, kwargs): index
+                    for index, analysis_id, kwargs in concurrent_requests
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        else:
+            for index, analysis_id, kwargs in concurrent_requests:
+                results[index] = self._get_analysis_data_timed(analysis_id, kwargs)
+
+        return {
+            'results': results,
+            'duration': time.monotonic() - start,
+        }
+
+    def _is_analysis_data_concurrent(self, kwargs):
+        # Only Plain SQL Reads Of The Odoo Database Are Safe On A Separate Read Only Cursor
+        # Drilldown Rewrites The Drilldown Dimensions Of The Analysis, It Runs In This Transaction
+        self.ensure_one()
+        if self.method not in ('table_view', 'query', 'table') or not self.table_id or self.table_id.is_direct:
+            return False
+        if any(kwargs.get(key) for key in ANALYSIS_BATCH_WRITING_KWARGS):
+            return False
+        return self.source_id.type == 'db_odoo'
+
+    def _get_analysis_data_thread(self, dbname, analysis_id, kwargs):
+        threading.current_thread().dbname = dbname
+        start = time.monotonic()
+        try:
+            with self.env.registry.cursor(readonly=True) as cr:
+                env = api.Environment(cr, self.env.uid, self.env.context)
+                return env['izi.analysis']._get_analysis_data_timed(analysis_id, kwargs)
+        except Exception as e:
+            _logger.warning('Failed to get data of analysis %s: %s', analysis_id, e)
+            return {
+                'analysis_id': analysis_id,
+                'error': str(e),
+                'duration': time.monotonic() - start,
+            }
+
+    @api.model
+    def _get_analysis_data_timed(self, analysis_id, kwargs):
+        start = time.monotonic()
+        result = {
+            'analysis_id': analysis_id,
+        }
+        try:
+            # A Failing Query Must Not Abort The Transaction The Other Analyses Run In
+            with self.env.cr.savepoint(flush=False):
+                result['data'] = self.browse(analysis_id).get_analysis_data(**kwargs)
+        except Exception as e:
+            _logger.warning('Failed to get data of analysis %s: %s', analysis_id, e)
+            result['error'] = str(e)
+        result['duration'] = time.monotonic() - start
+        return result
+
     def get_analysis_data_frame(self, **kwargs):
         self.ensure_one()
         self = self.sudo()
         if self.table_id and self.table_id.cron_id and self.table_id.cron_id.code:
-            res = self.table_id.cron_id.with_context(izi_table=self, kwargs=kwargs).ir_actions_server_id.run()
+            res = self.table_id.get_dataframe(analysis=self, kwargs=kwargs)
             # Automatic Get Fields From Data Frame
             if res and type(res) == dict and 'dataframe' in res and isinstance(res.get('dataframe'), pandas.DataFrame):
                 df = res.get('dataframe')
                 df = df.fillna('')
-
-                for col in df.columns:
-                    if df[col].dtype == 'object':
-                        sample_val = df[col].dropna().astype(str).head(1).tolist()
-                        if sample_val and re.match(r'^\d{4}-\d{2}-\d{2}', sample_val[0]):
-                            try:
-                                df[col] = pandas.to_datetime(df[col], errors='coerce').dt.date
-                            except Exception:
-                                pass
+                df = self.prepare_frame_dates(df)
                 
                 # To Apply Filters
                 domain = []
@@ -796,6 +1032,7 @@ class IZIAnalysis(models.Model):
                     # Process Action Filters
                     # Action Filters Is Active When The Chart Is Clicked
                     if kwargs.get('filters').get('action'):
+                        field_by_alias = self.table_id.get_field_metadata().get('field_by_alias')
                         for action_filter in kwargs.get('filters').get('action'):
                             action_filter_field_name = action_filter.get('field_name')
                             action_filter_operator = action_filter.get('operator', '=')
@@ -816,45 +1053,17 @@ class IZIAnalysis(models.Model):
                                 # Add Domain
                                 # TODO: Somehow it works with string value. Need to check later
                                 domain.append((action_filter_field_name, action_filter_operator, action_filter_value))
+                # Filters Are Compiled Into One Boolean Mask
+                mask = self.get_frame_domain_mask(df, domain)
                 # Build Filter Temp Query
                 # Temporary Filters is in Analysis View
                 if kwargs.get('filter_temp_values'):
                     for temp_filter in kwargs.get('filter_temp_values'):
-                        temp_domain = self.get_filter_temp_query_model(temp_filter)
-                        if temp_domain:
-                            domain += temp_domain
-                
-                pd_queries = []
-                local_vars = {}  # simpan variabel Python yang akan dipakai di query
-
-                for i, dm in enumerate(domain):
-                    if len(dm) == 3:
-                        dm_key = dm[0]
-                        dm_op = dm[1]
-                        if dm_op == '=':
-                            dm_op = '=='
-                        dm_val = dm[2]
-
-                        # siapkan nama variabel unik untuk query
-                        var_name = f"val_{i}"
-
-                        if isinstance(dm_val, str):
-                            # string langsung bungkus quote
-                            dm_val_str = f"'{dm_val}'"
-                        elif isinstance(dm_val, (date, datetime)):
-                            # simpan ke variabel Python agar bisa dipakai @
-                            local_vars[var_name] = dm_val
-                            dm_val_str = f"@{var_name}"
-                        else:
-                            # number atau tipe lain
-                            dm_val_str = str(dm_val)
-
-                        # backtick untuk nama kolom supaya aman dari keyword
-                        pd_queries.append(f"`{dm_key}` {dm_op} {dm_val_str}")
-
-                if pd_queries:
-                    pd_query = " and ".join(pd_queries)
-                    df = df.query(pd_query, local_dict=local_vars)
+                        temp_mask = self.get_filter_temp_mask_frame(df, temp_filter)
+                        if temp_mask is not False:
+                            mask &= temp_mask
+                if not mask.all():
+                    df = df[mask]
                 
                 rename = {}
                 df_fields = []
@@ -903,17 +1112,14 @@ class IZIAnalysis(models.Model):
                 if self.limit:
                     df = df.head(self.limit)
 
-                for col in df.columns:
-                    if df[col].dtype == 'object':
-                        # kalau ada yg masih object dan isinya date, convert ke string
-                        if df[col].apply(lambda x: isinstance(x, (date, datetime))).any():
-                            df[col] = df[col].apply(
-                                lambda x: x.strftime("%Y-%m-%d") if isinstance(x, (date, datetime)) else x
-                            )
-                    elif pandas.api.types.is_datetime64_any_dtype(df[col]):
-                        # kalau dtype datetime64, convert juga
-                        df[col] = df[col].dt.strftime("%Y-%m-%d")
-                
+                df = self.format_frame_dates(df)
+
+                if self._is_columnar_result(**kwargs):
+                    return self._get_analysis_columns_result({
+                        'metrics': df_metrics,
+                        'dimensions': df_dimensions,
+                    }, list(df.columns), [df[col].tolist() for col in df.columns])
+
                 return {
                     'data': df.to_dict('records'),
                     'metrics': df_metrics,
@@ -951,6 +1157,9 @@ class IZIAnalysis(models.Model):
                     response['metrics'] = []
                 response['fields'] = fields
                 response['is_metric_by_field'] = is_metric_by_field
+                if self._is_columnar_result(**kwargs):
+                    columns = [[dt.get(field) for dt in response.get('data') or []] for field in fields]
+                    return self._get_analysis_columns_result(response, fields, columns)
                 # Generate Values
                 values = []
                 if response.get('data'):
@@ -1005,10 +1214,9 @@ class IZIAnalysis(models.Model):
             max_dimension = kwargs.get('max_dimension')
 
         # Field
-        for field in self.table_id.field_ids:
-            field_alias = field.name
-            field_by_alias[field_alias] = field.field_name
-            field_type_by_alias[field_alias] = field.field_type
+        field_metadata = self.table_id.get_field_metadata()
+        field_by_alias = field_metadata.get('field_by_alias')
+        field_type_by_alias = field_metadata.get('field_type_by_alias')
         # Dimension
         dimensions = self.dimension_ids
         
@@ -1046,19 +1254,9 @@ class IZIAnalysis(models.Model):
             else:
                 field_name = dimension.field_id.field_name
             # Check If Selection
-            if self.env[self.model_id.model]._fields.get(dimension.field_id.field_name, False):
-                if self.env[self.model_id.model]._fields.get(dimension.field_id.field_name).type == 'selection':
-                    model_field = self.env[self.model_id.model]._fields[dimension.field_id.field_name]
-                    selection = None
-                    if not model_field.related:
-                        selection = model_field.selection
-                    else:
-                        if model_field.related_field:
-                            selection = model_field.related_field.selection
-                            if not selection and model_field.related_field.args and type(model_field.related_field.args) == dict and model_field.related_field.args.get('selection'):
-                                selection = model_field.related_field.args['selection']
-                    if selection:
-                        selection_dict_by_field_name[field_name] = dict(selection)
+            selection_dict = self.env['izi.table']._get_selection_labels(self.model_id.model, dimension.field_id.field_name)
+            if selection_dict:
+                selection_dict_by_field_name[field_name] = selection_dict
             dimension_queries.append(field_name)
             field_names.append(field_name)
             # Field Alias
@@ -1228,10 +1426,12 @@ class IZIAnalysis(models.Model):
             drilldown_limit = kwargs.get('drilldown_limit')
 
         records = self.env[self.model_id.model].read_group(domain, metric_queries, dimension_queries, limit=(drilldown_limit or self.limit), orderby=sort_queries, lazy=False)
+        is_columnar = self._is_columnar_result(**kwargs)
+        res_columns = [[] for field_name in field_names]
         res_data = []
         for record in records:
             dict_value = {}
-            for field_name in field_names:
+            for index, field_name in enumerate(field_names):
                 value = False
                 key = field_name
                 if record.get(field_name):
@@ -1254,8 +1454,27 @@ class IZIAnalysis(models.Model):
                     selection_dict = selection_dict_by_field_name[field_name]
                     if value in selection_dict:
                         value = selection_dict[value]
-                dict_value[key] = value
-            res_data.append(dict_value)
+                if is_columnar:
+                    res_columns[index].append(value)
+                else:
+                    dict_value[key] = value
+            if not is_columnar:
+                res_data.append(dict_value)
+
+        if is_columnar:
+            column_fields = [alias_by_field_name.get(field_name) or field_name for field_name in field_names]
+            for metric in self.metric_ids:
+                if metric.calculation == 'csum' and metric.name in column_fields:
+                    res_columns[column_fields.index(metric.name)] = self.get_cumulative_sum_values(
+                        res_columns[column_fields.index(metric.name)],
+                        [res_columns[column_fields.index(field)] for field in res_dimensions[1:] if field in column_fields],
+                    )
+            return self._get_analysis_columns_result({
+                'metrics': res_metrics,
+                'dimensions': res_dimensions,
+                'field_by_alias': field_by_alias,
+                'field_type_by_alias': field_type_by_alias,
+            }, column_fields, res_columns)
 
         # # Cumulative SUM
         # for metric in res_metrics:
@@ -1348,7 +1567,20 @@ class IZIAnalysis(models.Model):
             return transform_data
         else:
             return data
-    
+
+    def _transform_json_columns(self, columns):
+        # Same As _transform_json_data, For A Columnar Result
+        transform_indexes = []
+        transform_lang = False
+        for index, column in enumerate(columns):
+            value = next((value for value in column if value), False)
+            if type(value) == dict:
+                transform_indexes.append(index)
+                transform_lang = next(iter(value))
+        for index in transform_indexes:
+            columns[index] = [value.get(transform_lang, value[next(iter(value))]) if value else value for value in columns[index]]
+        return columns
+
     def check_special_variable(self, table_query, special_variable_values={}):
         # Replace Special Variable in Query
         user_id = self.env.user.id
@@ -1472,17 +1704,14 @@ class IZIAnalysis(models.Model):
 
         special_variable_values = {}
 
-        res_langs = self.env['res.lang'].with_context(active_test=False).search([('active', '=', True)], order='active desc')
-        for res_lang in res_langs:
-            res_lang_codes.append(res_lang.code)
+        res_lang_codes = self.env['izi.table'].get_lang_codes()
 
         # Field
-        for field in self.table_id.field_ids:
-            field_alias = field.name
-            field_by_alias[field_alias] = field.field_name
-            field_by_name[field.field_name] = field
-            alias_by_field_id[field.id] = field_alias
-            field_type_by_alias[field_alias] = field.field_type
+        field_metadata = self.table_id.get_field_metadata()
+        field_by_alias = field_metadata.get('field_by_alias')
+        field_type_by_alias = field_metadata.get('field_type_by_alias')
+        alias_by_field_id = field_metadata.get('alias_by_field_id')
+        field_by_name = field_metadata.get('field_by_name')
         
         max_dimension = False
         if 'max_dimension' in kwargs:
@@ -1550,9 +1779,13 @@ class IZIAnalysis(models.Model):
                 if count_dimension >= max_dimension:
                     break
         
+        # Output Column Of Each Select Query, Used To Rewrite Cumulative Sum Metrics With Window Functions
+        column_aliases = list(res_dimensions)
         if kwargs.get('custom_drilldown_field'):
             metric_queries = ['%s as "%s"' % (kwargs.get('custom_drilldown_field'), kwargs.get('custom_drilldown_field_label'))]
             dimension_queries = [kwargs.get('custom_drilldown_field')]
+            column_aliases = [kwargs.get('custom_drilldown_field_label')]
+        csum_metrics = []
         # Build Metric Query
         for metric in self.metric_ids:
             # metric_alias = "%s of %s" % (metric.calculation.title(), metric.field_id.name)
@@ -1565,15 +1798,19 @@ class IZIAnalysis(models.Model):
                 metric_name = metric.custom_query
                 metric_queries.append('%s as "%s"' % (
                     metric_name, metric_alias))
+                if metric.calculation == 'csum':
+                    csum_metrics.append((metric_alias, metric_name))
             else:
                 metric_calculation = metric.calculation
                 if metric_calculation == 'csum':
                     metric_calculation = 'sum'
+                    csum_metrics.append((metric_alias, 'sum(%s)' % metric_name))
                 if metric_calculation == 'countd':
                     metric_queries.append('count(distinct %s) as "%s"' % (metric_name, metric_alias))
                 else:
                     metric_queries.append('%s(%s) as "%s"' % (metric_calculation, metric_name, metric_alias))
 
+            column_aliases.append(metric_alias)
             res_metrics.append(metric_alias)
             res_fields.append(metric_alias)
 
@@ -1887,6 +2124,18 @@ class IZIAnalysis(models.Model):
             else:
                 sort_queries.append('%s %s' % (sort.field_id.field_name, sort.sort))
 
+        # Cumulative Sums Are Window Functions Over The Grouped Rows, Sorted As The Rows Are Returned
+        is_paginated = kwargs.get('pagination_limit') and kwargs.get('pagination_offset')
+        plain_metric_queries = list(metric_queries)
+        plain_sort_queries = list(sort_queries)
+        if csum_metrics and not is_paginated:
+            csum_query_by_alias, sort_queries = self.get_csum_window_queries(
+                csum_metrics=csum_metrics,
+                dimension_queries=dimension_queries,
+                sort_queries=sort_queries,
+            )
+            metric_queries = [csum_query_by_alias.get(column_alias, metric_query) for metric_query, column_alias in zip(metric_queries, column_aliases)]
+
         # Build Query
         # SELECT operation(metric) FROM table WHERE filter GROUP BY dimension ORDER BY sort
         metric_query = ', '.join(metric_queries)
@@ -1933,9 +2182,22 @@ class IZIAnalysis(models.Model):
             %s
         ''' % (metric_query, table_query, final_query, dimension_query, sort_query, limit_query)
 
-        if kwargs.get('pagination_limit') and kwargs.get('pagination_offset'):
-            query = 'SELECT * FROM (%s) original_query LIMIT %s OFFSET %s' % (
-                query, kwargs.get('pagination_limit'), kwargs.get('pagination_offset'))
+        paginated_query = False
+        if is_paginated:
+            # One Statement Returns The Page, The Row Count And The Cumulative Sums
+            paginated_query = self.get_paginated_query(
+                metric_queries=plain_metric_queries,
+                column_aliases=column_aliases,
+                csum_metrics=csum_metrics,
+                dimension_queries=dimension_queries,
+                sort_queries=plain_sort_queries,
+                table_query=table_query,
+                page_filter_query=final_query,
+                csum_filter_query=filter_query,
+                limit_query=limit_query,
+            )
+            query = 'SELECT *, count(*) OVER () AS "__izi_data_count" FROM (%s) original_query LIMIT %s OFFSET %s' % (
+                paginated_query, kwargs.get('pagination_limit'), kwargs.get('pagination_offset'))
 
         func_check_query = getattr(self.source_id, 'check_query_%s' % self.source_id.type)
         func_check_query(**{
@@ -1958,8 +2220,25 @@ class IZIAnalysis(models.Model):
         result = {'res_data': []}
 
         server_side = kwargs.get('server_side', False)
-
-        if not server_side or (server_side and kwargs.get('pagination_limit') != None and kwargs.get('pagination_offset') != None) or (server_side and kwargs.get('is_excel_export')):
+        is_executed = not server_side or (server_side and kwargs.get('pagination_limit') != None and kwargs.get('pagination_offset') != None) or (server_side and kwargs.get('is_excel_export'))
+
+        if self._is_columnar_result(**kwargs):
+            date_until_filter = False
+            if (not is_paginated and self.date_field_type == 'date_until' and filter_start_date and (dimension := dimension_by_field_id.get(self.date_field_id.id)) and (alias := alias_by_field_id.get(self.date_field_id.id))):
+                date_until_filter = (alias, filter_start_date, dimension.field_format)
+            return self.get_analysis_columns_query(
+                query=query if is_executed else False,
+                paginated_query=paginated_query,
+                date_until_filter=date_until_filter,
+                result={
+                    'metrics': res_metrics,
+                    'dimensions': res_dimensions,
+                    'field_by_alias': field_by_alias,
+                    'field_type_by_alias': field_type_by_alias,
+                },
+            )
+
+        if is_executed:
             if self.table_id.is_stored:
                 self.env.cr.execute(query)
                 result['res_data'] = self.env.cr.dictfetchall()
@@ -1973,108 +2252,25 @@ class IZIAnalysis(models.Model):
         res_data = self._transform_json_data(res_data)
 
         data_count = len(res_data)
-        if kwargs.get('pagination_limit') and kwargs.get('pagination_offset'):
-            query = '''
-                SELECT
-                    %s
-                FROM
-                    %s
-                %s
-                %s
-                %s
-                %s
-            ''' % (metric_query, table_query, final_query, dimension_query, sort_query, limit_query)
-
-            func_check_query = getattr(
-                self.source_id, 'check_query_%s' % self.source_id.type)
-            func_check_query(**{
-                'query': table_query,
-            })
-
-            result = {'res_data': []}
-            if self.table_id.is_stored:
-                self.env.cr.execute(query)
-                result['res_data'] = self.env.cr.dictfetchall()
+        if is_paginated:
+            if res_data:
+                data_count = res_data[0].get('__izi_data_count', 0)
             else:
-                func_get_analysis_data = getattr(
-                    self, 'get_analysis_data_%s' % self.source_id.type)
-                result = func_get_analysis_data(**{
-                    'query': query,
-                })
-            data_count = len(result['res_data'])
-
-        if kwargs.get('pagination_limit') and kwargs.get('pagination_offset'):
-            query = '''
-                SELECT
-                    %s
-                FROM
-                    %s
-                %s
-                %s
-                %s
-                %s
-            ''' % (metric_query, table_query, filter_query, dimension_query, sort_query, limit_query)
-
-            func_check_query = getattr(
-                self.source_id, 'check_query_%s' % self.source_id.type)
-            func_check_query(**{
-                'query': table_query,
-            })
-
-            result = {'res_data': []}
-            if self.table_id.is_stored:
-                self.env.cr.execute(query)
-                result['res_data'] = self.env.cr.dictfetchall()
-            else:
-                func_get_analysis_data = getattr(
-                    self, 'get_analysis_data_%s' % self.source_id.type)
-                result = func_get_analysis_data(**{
-                    'query': query,
-                })
-
-            res_data_temp = result.get('res_data')
-            res_data_temp = self._transform_json_data(res_data_temp)
-
-            for metric in self.metric_ids:
-                if metric.calculation == 'csum':
-                    res_data_temp = self.apply_cumulative_sum_by_group(
-                        res_data=res_data_temp,
-                        metric_name=metric.name_alias or metric.name,
-                        groupby_fields=res_dimensions[1:],
-                )
-
-            # === Replace metric values in res_data berdasarkan dimensi ===
-            if res_data and res_data_temp:
-                # ambil semua nama metric dari self.metric_ids
-                metric_names = [m.name_alias or m.name for m in self.metric_ids]
-
-                # semua dimensi aktif = res_dimensions tanpa metric
-                dim_keys = [d for d in res_dimensions if d not in metric_names]
-
-                def make_key(row):
-                    return tuple(row.get(dim) for dim in dim_keys)
-
-                # buat lookup dari res_data_temp
-                temp_lookup = {make_key(r): r for r in res_data_temp}
-
-                # overwrite metric di res_data dengan hasil dari res_data_temp
-                for row in res_data:
-                    key = make_key(row)
-                    if key in temp_lookup:
-                        temp_row = temp_lookup[key]
-                        for metric in metric_names:
-                            if metric in temp_row:
-                                row[metric] = temp_row[metric]
-
+                # Offset Past The Last Row, Count Separately
+                count_query = 'SELECT count(*) AS "__izi_data_count" FROM (%s) original_query' % (paginated_query)
+                if self.table_id.is_stored:
+                    self.env.cr.execute(count_query)
+                    result['res_data'] = self.env.cr.dictfetchall()
+                else:
+                    func_get_analysis_data = getattr(self, 'get_analysis_data_%s' % self.source_id.type)
+                    result = func_get_analysis_data(**{
+                        'query': count_query,
+                    })
+                if result.get('res_data'):
+                    data_count = result.get('res_data')[0].get('__izi_data_count', 0)
+            for record in res_data:
+                record.pop('__izi_data_count', None)
         else:
-            for metric in self.metric_ids:
-                if metric.calculation == 'csum':
-                    res_data = self.apply_cumulative_sum_by_group(
-                        res_data=res_data,
-                        metric_name=metric.name_alias or metric.name,
-                        groupby_fields=res_dimensions[1:],
-                    )
-
             if (self.date_field_type == 'date_until' and filter_start_date and (dimension := dimension_by_field_id.get(self.date_field_id.id)) and (alias := alias_by_field_id.get(self.date_field_id.id))):
                 res_data = self.filter_data_by_date(
                     res_data,
@@ -2119,6 +2315,157 @@ class IZIAnalysis(models.Model):
                 }
             }
 
+    def get_analysis_columns_query(self, **kwargs):
+        # Columnar Response Of get_analysis_data_query, Built From The Cursor Tuples Without A Dict Per Row
+        result = kwargs.get('result')
+        res_fields = []
+        res_columns = []
+        if kwargs.get('query'):
+            res_fields, res_columns = self.get_query_columns(kwargs.get('query'))
+        res_columns = self._transform_json_columns(res_columns)
+
+        data_count = len(res_columns[0]) if res_columns else 0
+        if kwargs.get('paginated_query'):
+            if '__izi_data_count' in res_fields:
+                count_index = res_fields.index('__izi_data_count')
+                count_column = res_columns.pop(count_index)
+                res_fields.pop(count_index)
+                data_count = count_column[0] if count_column else 0
+            if not data_count and kwargs.get('query'):
+                # Offset Past The Last Row, Count Separately
+                count_query = 'SELECT count(*) AS "__izi_data_count" FROM (%s) original_query' % (kwargs.get('paginated_query'))
+                count_fields, count_columns = self.get_query_columns(count_query)
+                if count_columns and count_columns[0]:
+                    data_count = count_columns[0][0]
+        elif kwargs.get('date_until_filter') and kwargs.get('date_until_filter')[0] in res_fields:
+            alias, filter_start_date, field_format = kwargs.get('date_until_filter')
+            cutoff_date = self.get_cutoff_date(filter_start_date, field_format)
+            date_column = res_columns[res_fields.index(alias)]
+            mask = [self.parse_date_auto(value) >= cutoff_date for value in date_column]
+            res_columns = [[value for value, keep in zip(column, mask) if keep] for column in res_columns]
+            data_count = sum(mask)
+
+        result['data_count'] = data_count
+        return self._get_analysis_columns_result(result, res_fields, res_columns)
+
+    def get_query_columns(self, query):
+        # Returns The Field Names And One List Of Values Per Field
+        if self.table_id.is_stored:
+            self.env.cr.execute(query)
+            res_fields = [column[0] for column in self.env.cr.description]
+            res_rows = self.env.cr.fetchall()
+        elif self._is_columnar_supported():
+            func_get_analysis_rows = getattr(self, 'get_analysis_rows_%s' % self.source_id.type)
+            result = func_get_analysis_rows(**{
+                'query': query,
+            })
+            res_fields = result.get('res_fields')
+            res_rows = result.get('res_rows')
+        else:
+            # Sources Without Rows Return Dicts, Transposed Here
+            func_get_analysis_data = getattr(self, 'get_analysis_data_%s' % self.source_id.type)
+            res_data = func_get_analysis_data(**{
+                'query': query,
+            }).get('res_data') or []
+            res_fields = list(res_data[0].keys()) if res_data else []
+            res_rows = [[record.get(field) for field in res_fields] for record in res_data]
+        if not res_rows:
+            return res_fields, [[] for field in res_fields]
+        return res_fields, [list(column) for column in zip(*res_rows)]
+
+    def get_csum_window_queries(self, **kwargs):
+        # Returns The Window Query Of Each Cumulative Sum Metric By Alias, And The Sort The Rows Must Be Returned With
+        # The Running Total Restarts For Each Combination Of The Non Leading Dimensions, Like apply_cumulative_sum_by_group
+        # Dimensions Break Ties Of The Sort, So Rows Are Accumulated In The Same Order They Are Returned
+        dimension_queries = kwargs.get('dimension_queries')
+        order_queries = list(kwargs.get('sort_queries')) + list(dimension_queries)
+        partition_query = ''
+        if dimension_queries[1:]:
+            partition_query = 'PARTITION BY %s ' % ', '.join(dimension_queries[1:])
+        window_query = 'OVER (%sORDER BY %s ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)' % (
+            partition_query, ', '.join(order_queries) or '1')
+        csum_query_by_alias = {}
+        for metric_alias, metric_aggregate in kwargs.get('csum_metrics'):
+            csum_query_by_alias[metric_alias] = 'sum(%s) %s as "%s"' % (metric_aggregate, window_query, metric_alias)
+        return csum_query_by_alias, order_queries
+
+    def get_paginated_query(self, **kwargs):
+        # Build The Query Of All Rows Of A Paginated Analysis, Without The Page Limit
+        # Cumulative Sums Are Window Functions Partitioned By The Non Leading Dimensions, So They Do Not Depend
+        # On The Page. When The Page Filter Differs From The Cumulative Filter (Date Until), The Cumulative Sums
+        # Are Computed On The Cumulative Filter And Joined To The Page Rows By Their Dimensions.
+        metric_queries = kwargs.get('metric_queries')
+        column_aliases = kwargs.get('column_aliases')
+        csum_metrics = kwargs.get('csum_metrics')
+        dimension_queries = kwargs.get('dimension_queries')
+        table_query = kwargs.get('table_query')
+        page_filter_query = kwargs.get('page_filter_query') or ''
+        csum_filter_query = kwargs.get('csum_filter_query') or ''
+        limit_query = kwargs.get('limit_query') or ''
+
+        csum_query_by_alias, order_queries = self.get_csum_window_queries(
+            csum_metrics=csum_metrics,
+            dimension_queries=dimension_queries,
+            sort_queries=kwargs.get('sort_queries'),
+        )
+        order_query = ', '.join(order_queries) or '1'
+        dimension_query = ''
+        if dimension_queries:
+            dimension_query = 'GROUP BY %s' % ', '.join(dimension_queries)
+
+        if not csum_metrics or page_filter_query == csum_filter_query:
+            select_queries = []
+            for metric_query, column_alias in zip(metric_queries, column_aliases):
+                select_queries.append(csum_query_by_alias.get(column_alias, metric_query))
+            return '''
+                SELECT
+                    %s
+                FROM
+                    %s
+                %s
+                %s
+                ORDER BY %s
+                %s
+            ''' % (', '.join(select_queries), table_query, page_filter_query, dimension_query, order_query, limit_query)
+
+        dimension_aliases = column_aliases[:len(dimension_queries)]
+        page_query = '''
+            SELECT
+                %s, row_number() OVER (ORDER BY %s) AS "__izi_row"
+            FROM
+                %s
+            %s
+            %s
+            ORDER BY %s
+            %s
+        ''' % (', '.join(metric_queries), order_query, table_query, page_filter_query, dimension_query, order_query, limit_query)
+        # Dimension Columns Are Selected As In The Page, So Both Sides Join On The Same Values
+        csum_select_queries = metric_queries[:len(dimension_queries)]
+        csum_query = '''
+            SELECT
+                %s
+            FROM
+                %s
+            %s
+            %s
+        ''' % (', '.join(csum_select_queries + list(csum_query_by_alias.values())), table_query, csum_filter_query, dimension_query)
+        select_queries = []
+        for column_alias in column_aliases:
+            if column_alias in csum_query_by_alias:
+                select_queries.append('COALESCE(csum_query."%s", page_query."%s") as "%s"' % (column_alias, column_alias, column_alias))
+            else:
+                select_queries.append('page_query."%s"' % column_alias)
+        join_queries = []
+        for dimension_alias in dimension_aliases:
+            join_queries.append('page_query."%s" IS NOT DISTINCT FROM csum_query."%s"' % (dimension_alias, dimension_alias))
+        return '''
+            SELECT
+                %s
+            FROM (%s) page_query
+            LEFT JOIN (%s) csum_query ON (%s)
+            ORDER BY page_query."__izi_row"
+        ''' % (', '.join(select_queries), page_query, csum_query, ' AND '.join(join_queries) or 'TRUE')
+
     def get_records_by_query(self,metric_query, table_query, filter_query):
         query = '''
             SELECT
@@ -2324,26 +2671,34 @@ class IZIAnalysis(models.Model):
         """
         if groupby_fields is None:
             groupby_fields = []
+        if not res_data:
+            return res_data
 
-        # Simpan history nilai per grup
-        # key = tuple group, value = list of (index, value)
-        group_history = defaultdict(list)
-
-        # Kumpulkan nilai berdasarkan group
-        for idx, row in enumerate(res_data):
-            group_key = tuple(row[field] for field in groupby_fields)
-            value = row.get(metric_name, 0) or 0
-            group_history[group_key].append((idx, value))
-
-        # Hitung cumulative per group dan masukkan kembali ke res_data
-        for group_key, index_value_list in group_history.items():
-            values = [val for idx, val in index_value_list]
-            cumsums = list(accumulate(values))
-            for (idx, _), cumval in zip(index_value_list, cumsums):
-                res_data[idx][metric_name] = cumval
+        df = pandas.DataFrame(res_data, columns=list(groupby_fields) + [metric_name])
+        cumsums = self.get_cumulative_sum_values(df[metric_name], [df[field] for field in groupby_fields])
+
+        for row, cumval in zip(res_data, cumsums):
+            row[metric_name] = cumval
         
         return res_data
 
+    def get_cumulative_sum_values(self, values, group_columns=None):
+        """
+        Running total per group in row order, empty values count as 0.
+
+        :param values: Nilai metric per baris
+        :param group_columns: List of columns (satu nilai per baris) untuk pengelompokan
+        """
+        values = pandas.Series(values).fillna(0)
+        values = values.where(values.astype(bool), 0)
+        if values.dtype == object:
+            values = pandas.to_numeric(values, errors='coerce').fillna(0)
+        if group_columns:
+            cumsums = values.groupby([pandas.Series(column, index=values.index) for column in group_columns], dropna=False, sort=False).cumsum()
+        else:
+            cumsums = values.cumsum()
+        return cumsums.tolist()
+
     def parse_date_auto(self, date_str):
         """
         Mendeteksi format tanggal (day, week, month, quarter, year)
@@ -2403,6 +2758,19 @@ class IZIAnalysis(models.Model):
         cutoff_str sudah pasti format 'YYYY-MM-DD'.
         mode: 'day', 'week', 'month', 'quarter', 'year'
         """
+        cutoff_date = self.get_cutoff_date(cutoff_str, mode)
+
+        result = []
+        for item in data_list:
+            item_date = self.parse_date_auto(item[date_key])
+            if item_date >= cutoff_date:
+                result.append(item)
+        return result       
+
+    def get_cutoff_date(self, cutoff_str, mode):
+        """
+        Mengubah cutoff_str 'YYYY-MM-DD' menjadi awal periode sesuai mode.
+        """
         cutoff_date = datetime.strptime(cutoff_str, "%Y-%m-%d").date()
 
         # Normalisasi cutoff sesuai mode
@@ -2416,13 +2784,7 @@ class IZIAnalysis(models.Model):
         elif mode == "week":
             # ISO Monday
             cutoff_date = cutoff_date - timedelta(days=cutoff_date.weekday())
-
-        result = []
-        for item in data_list:
-            item_date = self.parse_date_auto(item[date_key])
-            if item_date >= cutoff_date:
-                result.append(item)
-        return result       
+        return cutoff_date
 
 
 class IZIAnalysisMetric(models.Model):
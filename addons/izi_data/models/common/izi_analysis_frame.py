@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+from odoo import models, _
+from odoo.exceptions import ValidationError
+from collections import OrderedDict
+import pandas
+import re
+import threading
+
+# Dtype Inference Of The Direct Table Columns
+# Keyed By Table, Script Digest, Column And The Dtype Pandas Gave It, So A Column Is Probed Once Per Worker Until Its Dtype Or The Script Changes
+# Least Recently Used Entries Are Dropped Past FRAME_DATE_COLUMN_CACHE_MAX_SIZE
+FRAME_DATE_COLUMN_CACHE_MAX_SIZE = 10000
+_frame_date_column_cache = OrderedDict()
+_frame_date_column_lock = threading.Lock()
+
+
+def clear_frame_date_column_cache(dbname, table_id):
+    with _frame_date_column_lock:
+        for key in [key for key in _frame_date_column_cache if key[0] == dbname and key[1] == table_id]:
+            del _frame_date_column_cache[key]
+
+FRAME_COMPARISON_OPERATORS = {
+    '=': '__eq__',
+    '==': '__eq__',
+    '!=': '__ne__',
+    '<>': '__ne__',
+    '>': '__gt__',
+    '>=': '__ge__',
+    '<': '__lt__',
+    '<=': '__le__',
+}
+
+
+class IZIAnalysisFrame(models.Model):
+    _inherit = 'izi.analysis'
+
+    def _is_frame_date_column(self, df, col, digest=False):
+        # Object Columns Whose First Non Empty Value Looks Like YYYY-MM-DD Are Dates
+        key = (self.env.cr.dbname, self.table_id.id, digest, col, str(df[col].dtype))
+        with _frame_date_column_lock:
+            if key in _frame_date_column_cache:
+                _frame_date_column_cache.move_to_end(key)
+                return _frame_date_column_cache[key]
+        is_date = False
+        sample_val = []
+        if df[col].dtype == 'object':
+            sample_val = df[col][df[col].ne('')].dropna().head(1).astype(str).tolist()
+            is_date = bool(sample_val and re.match(r'^\d{4}-\d{2}-\d{2}', sample_val[0]))
+            # A Column Without Any Value Says Nothing Yet, It Is Probed Again On The Next Frame
+            if not sample_val:
+                return is_date
+        with _frame_date_column_lock:
+            _frame_date_column_cache[key] = is_date
+            while len(_frame_date_column_cache) > FRAME_DATE_COLUMN_CACHE_MAX_SIZE:
+                _frame_date_column_cache.popitem(last=False)
+        return is_date
+
+    def prepare_frame_dates(self, df):
+        # Date Columns Become datetime64 Truncated To The Day, Compared And Grouped Without Python Objects
+        digest = self.table_id._get_frame_cache_digest() if self.table_id else False
+        for col in df.columns:
+            if self._is_frame_date_column(df, col, digest):
+                df[col] = pandas.to_datetime(df[col], errors='coerce').dt.normalize()
+        return df
+
+    def format_frame_dates(self, df):
+        for col in df.columns:
+            if pandas.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = df[col].dt.strftime('%Y-%m-%d').fillna('')
+        return df
+
+    def _get_frame_value(self, column, value):
+        if pandas.api.types.is_datetime64_any_dtype(column) and value not in (False, None, ''):
+            return pandas.Timestamp(value)
+        return value
+
+    def _get_frame_text(self, column):
+        if pandas.api.types.is_datetime64_any_dtype(column):
+            return column.dt.strftime('%Y-%m-%d')
+        return column.astype(str)
+
+    def get_frame_domain_mask(self, df, domain):
+        # Compile The Domain (Leaves Joined With And) Into One Boolean Mask
+        mask = pandas.Series(True, index=df.index)
+        for dm in domain:
+            if len(dm) != 3:
+                continue
+            dm_key, dm_op, dm_val = dm
+            if dm_key not in df.columns:
+                raise ValidationError(_('Field %s is not found in the data of table %s') % (dm_key, self.table_id.name))
+            column = df[dm_key]
+            if dm_op in ('in', 'not in'):
+                if not isinstance(dm_val, (list, tuple, set)):
+                    dm_val = [dm_val]
+                dm_mask = column.isin([self._get_frame_value(column, val) for val in dm_val])
+                if dm_op == 'not in':
+                    dm_mask = ~dm_mask
+            elif dm_op in ('like', 'ilike', 'not like', 'not ilike'):
+                dm_mask = self._get_frame_text(column).str.contains(str(dm_val), case=(dm_op in ('like', 'not like')), regex=False, na=False)
+                if dm_op.startswith('not'):
+                    dm_mask = ~dm_mask
+            elif dm_op in FRAME_COMPARISON_OPERATORS:
+                if dm_val is False or dm_val is None:
+                    dm_mask = column.isna()
+                    if column.dtype == 'object':
+                        dm_mask |= column.eq('')
+                    if dm_op not in ('=', '=='):
+                        dm_mask = ~dm_mask
+                else:
+                    dm_mask = getattr(column, FRAME_COMPARISON_OPERATORS[dm_op])(self._get_frame_value(column, dm_val))
+            else:
+                raise ValidationError(_('Operator %s is not supported on data frame tables') % dm_op)
+            mask &= dm_mask.fillna(False).astype(bool)
+        return mask
+
+    def get_filter_temp_mask_frame(self, df, filter):
+        # Same Semantics As get_filter_temp_query_db_odoo
+        # String Search Matches Any Value (ilike), Date Range And Date Format Keep The Rows Between The Bounds
+        filter_field = filter[0]
+        filter_type = filter[1]
+        filter_list = filter[2]
+        domain = []
+
+        if filter_type == 'string_search':
+            if not filter_list or filter_field not in df.columns:
+                return False
+            text = self._get_frame_text(df[filter_field])
+            mask = pandas.Series(False, index=df.index)
+            for value in filter_list:
+                mask |= text.str.contains(str(value), case=False, regex=False, na=False)
+            return mask
+
+        elif filter_type == 'date_range':
+            if filter_list:
+                start_date = filter_list[0]
+                end_date = filter_list[1] if len(filter_list) == 2 else False
+                if start_date is not False and start_date is not None:
+                    domain.append((filter_field, '>=', start_date))
+                if end_date is not False and end_date is not None:
+                    domain.append((filter_field, '<=', end_date))
+
+        elif filter_type == 'date_format':
+            if filter_list:
+                date_range = self.get_date_range_by_date_format(filter_list[0])
+                if date_range.get('start_date'):
+                    domain.append((filter_field, '>=', date_range.get('start_date')))
+                if date_range.get('end_date'):
+                    domain.append((filter_field, '<=', date_range.get('end_date')))
+
+        if not domain:
+            return False
+        return self.get_frame_domain_mask(df, domain)
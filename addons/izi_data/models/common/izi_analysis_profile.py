@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+from odoo import models, fields, api, SUPERUSER_ID, _
+import copy
+import hashlib
+import json
+import logging
+import re
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Defaults Of The System Parameters, See data/ir_config_parameter.xml
+PROFILE_SLOW_THRESHOLD_MS = 1000
+PROFILE_MAX_RECORDS = 1000
+# The Ring Buffer Is Pruned Once Every PROFILE_PRUNE_INTERVAL Records
+PROFILE_PRUNE_INTERVAL = 100
+
+
+def get_query_fingerprint(query):
+    # Same Fingerprint For Queries That Only Differ By Their Literals Or Spacing
+    query = re.sub(r'\$\$.*?\$\$', '?', query or '', flags=re.S)
+    query = re.sub(r"'(?:[^']|'')*'", '?', query)
+    query = re.sub(r'\b\d+(\.\d+)?\b', '?', query)
+    query = re.sub(r'\s+', ' ', query).strip().lower()
+    return hashlib.sha1(query.encode()).hexdigest()[:16]
+
+
+class IZIAnalysisProfile(models.Model):
+    _name = 'izi.analysis.profile'
+    _description = 'IZI Analysis Profile'
+    _order = 'id desc'
+
+    analysis_id = fields.Many2one('izi.analysis', string='Analysis', required=True, ondelete='cascade', index=True)
+    method = fields.Char('Method')
+    duration = fields.Float('Duration (ms)', digits=(16, 1), aggregator='max')
+    row_count = fields.Integer('Rows', aggregator='max')
+    result_size = fields.Integer('Result Size (Bytes)', aggregator='max')
+    is_slow = fields.Boolean('Slow')
+    fingerprint = fields.Char('Fingerprint', index=True)
+    query = fields.Text('Query')
+    explain = fields.Text('Explain')
+
+    @api.model
+    def get_slowest_analyses(self, limit=10):
+        # Analyses Ordered By Their Slowest Recorded Execution
+        res = []
+        groups = self._read_group([], ['analysis_id'], ['duration:max', 'duration:avg', '__count'], order='duration:max desc', limit=limit)
+        for analysis, max_duration, avg_duration, count in groups:
+            res.append({
+                'analysis_id': analysis.id,
+                'name': analysis.name,
+                'max_duration': max_duration,
+                'avg_duration': avg_duration,
+                'count': count,
+            })
+        return res
+
+    @api.model
+    def _prune(self, last_id):
+        # Ring Buffer, Only The Latest izi_data.profile_max_records Executions Are Kept
+        max_records = int(self.env['ir.config_parameter'].sudo().get_param('izi_data.profile_max_records', PROFILE_MAX_RECORDS))
+        self.env.cr.execute('''
+            DELETE FROM izi_analysis_profile
+            WHERE id <= %s
+        ''', (last_id - max_records,))
+
+
+class IZIAnalysis(models.Model):
+    _inherit = 'izi.analysis'
+
+    profile_enabled = fields.Boolean('Profile Executions', default=False,
+                                     help='Record every execution in the profiles. Slow executions are logged anyway.')
+    profile_explain = fields.Boolean('Record Explain', default=False,
+                                     help='Run EXPLAIN (ANALYZE, BUFFERS) after each execution of a mart table or Odoo database query. The query runs twice.')
+    profile_ids = fields.One2many('izi.analysis.profile', 'analysis_id', string='Profiles')
+
+    def _get_analysis_data(self, **kwargs):
+        if 'test_analysis' in self._context or self._context.get('action_return_domain'):
+            return super(IZIAnalysis, self)._get_analysis_data(**kwargs)
+        start = time.monotonic()
+        result = super(IZIAnalysis, self)._get_analysis_data(**kwargs)
+        duration = (time.monotonic() - start) * 1000
+        try:
+            self._record_profile(duration, result, **kwargs)
+        except Exception as e:
+            _logger.warning('Failed to record the profile of analysis %s: %s', self.id, e)
+        return result
+
+    def _record_profile(self, duration, result, **kwargs):
+        self.ensure_one()
+        threshold = float(self.env['ir.config_parameter'].sudo().get_param('izi_data.slow_analysis_threshold_ms', PROFILE_SLOW_THRESHOLD_MS))
+        is_slow = duration >= threshold
+        # Analyses Not Profiled Only Cost The Timing, Unless They Are Slow
+        if not self.profile_enabled and not is_slow:
+            return
+        result = result or {}
+        row_count = self._get_profile_row_count(result)
+
+        # The Query Is Only Rebuilt For Slow Or Explained SQL Analyses
+        query = False
+        fingerprint = False
+        explain = False
+        is_explained = self.profile_enabled and self.profile_explain and self._is_profile_explain_supported()
+        if self.method in ('table_view', 'query', 'table') and self.table_id and not self.table_id.is_direct and not kwargs.get('drilldown_level') and (is_slow or is_explained):
+            query = self.with_context(action_return_domain=True).get_analysis_data_query(**copy.deepcopy(kwargs)).get('query')
+            fingerprint = get_query_fingerprint(query)
+            if is_explained:
+                explain = self._explain_analysis_query(query)
+        if is_slow:
+            _logger.warning('Slow analysis %s (%s): %.0f ms, %s rows, fingerprint %s', self.id, self.name, duration, row_count, fingerprint or '-')
+        if not self.profile_enabled:
+            return
+
+        # Recorded In Its Own Transaction, Also When This One Is Read Only Or Rolled Back
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            profile = env['izi.analysis.profile'].create({
+                'analysis_id': self.id,
+                'method': self.method,
+                'duration': duration,
+                'row_count': row_count,
+                'result_size': self._estimate_profile_result_size(result, row_count),
+                'is_slow': is_slow,
+                'fingerprint': fingerprint,
+                'query': query,
+                'explain': explain,
+            })
+            if profile.id % PROFILE_PRUNE_INTERVAL == 0:
+                env['izi.analysis.profile']._prune(profile.id)
+
+    def _get_profile_row_count(self, result):
+        row_count = result.get('data_count')
+        if row_count is None:
+            row_count = len(result.get('data') or (result.get('columns') or [[]])[0])
+        return row_count
+
+    def _estimate_profile_result_size(self, result, row_count):
+        # Size Of The First Row Times The Rows, The Whole Result Is Not Serialized Again
+        if not row_count:
+            return 0
+        if result.get('data'):
+            first_row = result['data'][0]
+        else:
+            first_row = [column[0] for column in result.get('columns') or [] if column]
+        return len(json.dumps(first_row, default=str)) * row_count
+
+    def _is_profile_explain_supported(self):
+        # EXPLAIN Is PostgreSQL Syntax, Only Run On Mart Tables And Odoo Database Sources
+        return bool(self.table_id.is_stored or self.source_id.type == 'db_odoo')
+
+    def _explain_analysis_query(self, query):
+        try:
+            with self.env.cr.savepoint(flush=False):
+                res_fields, res_columns = self.get_query_columns('EXPLAIN (ANALYZE, BUFFERS) %s' % query)
+        except Exception as e:
+            return str(e)
+        return '\n'.join(res_columns[0]) if res_columns else ''
+
+    def action_open_profiles(self):
+        self.ensure_one()
+        return {
+            'name': _('Profiles'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'izi.analysis.profile',
+            'view_mode': 'list,form',
+            'domain': [('analysis_id', '=', self.id)],
+            'target': 'current',
+        }
@@ -1,14 +1,135 @@
 # -*- coding: utf-8 -*-
 # Copyright 2022 IZI PT Solusi Usaha Mudah
 import re
-
-from odoo import models, fields, api, _
+import io
+import os
+import glob
+import json
+import numbers
+import hashlib
+import logging
+import threading
+import time
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
-from datetime import datetime, timedelta
+from odoo.tools import config
+from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 from odoo.tools.safe_eval import safe_eval
+from .izi_analysis import invalidate_analysis_cache
+from .izi_analysis_frame import clear_frame_date_column_cache
+from collections import OrderedDict
 import pandas
 
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+_logger = logging.getLogger(__name__)
+
+# Data Frame Cache Of Direct Tables
+# Opt In With frame_cache_ttl, The Output Of The Table Script Is Shared By All Analyses Of The Table In The Worker Until It Expires.
+# Frames Are Keyed By The Script, The User And The Companies, Scripts Reading The Analysis Kwargs Must Keep frame_cache_ttl At 0.
+# Frames Are Evicted By LRU Order Once They Take More Than FRAME_CACHE_MAX_BYTES.
+# With pyarrow Installed The Frame Is Also Written As Parquet In The Filestore, Other Workers Read It Memory Mapped.
+FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_frame_cache = OrderedDict()
+_frame_cache_lock = threading.Lock()
+
+# Rows Sent Per COPY Statement By copy_store_table_data, Bounds The Memory Of The Buffer
+STORE_COPY_CHUNK_SIZE = 10000
+COPY_INTEGER_TYPES = ('int2', 'int4', 'int8', 'bit')
+COPY_FLOAT_TYPES = ('float4', 'float8', 'numeric')
+COPY_BOOLEAN_TYPES = ('boolean', 'bool')
+
+
+def copy_escape(text):
+    # Text Format Of COPY, Backslash And The Separators Must Be Escaped
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_value(value, type_origin=False):
+    # One Value In The Text Format Of COPY, Converted By The Column Type Of The Mart Table
+    # False Is The Empty Value Of Odoo For Typed Columns, It Stays A Boolean When The Type Is Unknown
+    # None, NaN, NaT And pandas.NA Are All Missing Values, Lists And Dicts Are Not Scalars
+    if pandas.api.types.is_scalar(value) and pandas.isna(value):
+        return '\\N'
+    if value is False and type_origin and type_origin not in COPY_BOOLEAN_TYPES:
+        return '\\N'
+    if type_origin in COPY_BOOLEAN_TYPES or (not type_origin and isinstance(value, bool)):
+        return 't' if value and value not in ('f', 'false', 'False', '0') else 'f'
+    if type_origin in COPY_INTEGER_TYPES or type_origin in COPY_FLOAT_TYPES:
+        if value == '':
+            return '\\N'
+        if type_origin in COPY_INTEGER_TYPES:
+            # Going Through float Would Round int8 Values Past 2^53
+            if isinstance(value, numbers.Integral):
+                return str(int(value))
+            try:
+                return str(int(value))
+            except (TypeError, ValueError):
+                return str(int(float(value)))
+        return repr(float(value)) if isinstance(value, float) else str(value)
+    if type_origin == 'bytea':
+        if isinstance(value, str):
+            value = value.encode()
+        return '\\\\x%s' % bytes(value).hex()
+    if isinstance(value, (dict, list)):
+        return copy_escape(json.dumps(value, default=str))
+    if hasattr(value, 'isoformat'):
+        if type_origin == 'date':
+            return value.isoformat()[:10]
+        # Columns Without Time Zone Hold UTC, PostgreSQL Would Ignore The Offset
+        if type_origin == 'timestamp' and getattr(value, 'tzinfo', None) is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    if type_origin in ('date', 'timestamp', 'timestamptz') and value == '':
+        return '\\N'
+    return copy_escape(str(value))
+
+
+def copy_rows(cr, table_name, columns, rows, type_origins=None, chunk_size=STORE_COPY_CHUNK_SIZE):
+    # Streams Rows (Tuples In The Order Of columns) Into The Table With COPY FROM STDIN, chunk_size Rows At A Time
+    # Returns The Number Of Rows Copied
+    type_origins = type_origins or [False] * len(columns)
+    copy_query = 'COPY %s (%s) FROM STDIN' % (table_name, ', '.join(columns))
+    count = 0
+    buffer = io.StringIO()
+    chunk_count = 0
+    for row in rows:
+        buffer.write('\t'.join(copy_value(value, type_origin) for value, type_origin in zip(row, type_origins)))
+        buffer.write('\n')
+        chunk_count += 1
+        if chunk_count >= chunk_size:
+            buffer.seek(0)
+            cr.copy_expert(copy_query, buffer)
+            count += chunk_count
+            buffer = io.StringIO()
+            chunk_count = 0
+    if chunk_count:
+        buffer.seek(0)
+        cr.copy_expert(copy_query, buffer)
+        count += chunk_count
+    return count
+
+
+def get_shadow_name(name):
+    # Name Of The Shadow Table (Or Index) A Swap Refresh Loads Into, Within The 63 Bytes Of Postgres Identifiers
+    return '%s__next' % name[:57]
+
+
+def iter_rows(data, columns):
+    # Rows Of A DataFrame, A List Or An Iterator Of Dicts As Tuples In The Order Of columns
+    if isinstance(data, pandas.DataFrame):
+        data = data.reindex(columns=columns)
+        for row in data.itertuples(index=False, name=None):
+            yield row
+    else:
+        for record in data:
+            yield tuple(record.get(column) for column in columns)
+
 DEFAULT_DB_QUERY = """
 # -- Query example
 # select
@@ -48,11 +169,13 @@ res_data = []
 """
 
 DEFAULT_PYTHON_CODE_WITH_QUERY = """
-res = izi.query_fetch('''%(db_query)s''')
+# Reload Or Upsert The Mart Table Following The Refresh Mode Of The Table
+izi_table.refresh_store_table_data(query='''%(db_query)s''')
+"""
 
-izi.query_execute('TRUNCATE %(store_table_name)s')
-for r in res:
-  izi.query_insert('%(store_table_name)s', r)
+DEFAULT_PYTHON_CODE_WITH_MATERIALIZED_VIEW = """
+# Refresh The Materialized View Inside The Database, The Data Does Not Go Through Python
+izi_table.refresh_materialized_view()
 """
 
 DEFAULT_PYTHON_CODE_WITH_DATAFRAME = """
@@ -60,13 +183,12 @@ DEFAULT_PYTHON_CODE_WITH_DATAFRAME = """
 pd = izi.lib('pandas')
 try:
     if isinstance(res_dataframe, pd.DataFrame):
-        res_data = res_dataframe.to_dict('records')
+        res_data = res_dataframe
 except:
     res_data = []
 
 izi.query_execute('TRUNCATE %(store_table_name)s')
-for r in res_data:
-    izi.query_insert('%(store_table_name)s', r)
+izi.query_copy('%(store_table_name)s', res_data)
 """
 
 DEFAULT_GET_PYTHON_CODE = """%s
@@ -208,6 +330,7 @@ class IZITable(models.Model):
     stored_option = fields.Selection([
         ('query', 'Database Query'),
         ('stored', 'Stored To Mart Table'),
+        ('materialized', 'Materialized View'),
         ('direct', 'Directly Access Data Source'),
     ], string='Method', default='query', required=False)
     model_id = fields.Many2one('ir.model', string='Model')
@@ -269,6 +392,29 @@ class IZITable(models.Model):
     dummy_data_attachment_id = fields.Many2one('ir.attachment', string='Dummy Data File')
     ai_prompt = fields.Text('Additional Prompt For AI')
 
+    index_ids = fields.One2many('izi.table.index', 'table_id', string='Indexes')
+    refresh_mode = fields.Selection([
+        ('truncate', 'Truncate And Reload'),
+        ('swap', 'Load Into Shadow Table And Swap'),
+        ('incremental', 'Incremental Upsert'),
+    ], string='Refresh Mode', default='truncate', required=True,
+        help='Swap loads the scheduler data into <table>__next and renames it over the mart table at the end, '
+             'readers keep the old data during the load and a failed refresh leaves it untouched. '
+             'Incremental only extracts the rows changed since the watermark and upserts them by the key fields.')
+    incremental_key_fields = fields.Char(string='Key Fields', help='Comma separated fields identifying a row, e.g. id. '
+                                                                   'Materialized views are refreshed concurrently when they are set.')
+    incremental_date_field = fields.Char(string='Watermark Field', help='Field of the last change of a row, e.g. write_date')
+    incremental_window_field = fields.Char(string='Window Field',
+                                           help='Rows of the mart whose source disappeared are deleted when this field is within the interval. '
+                                                'Empty checks the whole table.')
+    incremental_watermark = fields.Datetime(string='Watermark', copy=False,
+                                            help='Latest change loaded into the mart table, the next refresh extracts the rows changed since.')
+
+    frame_cache_ttl = fields.Integer(string='Data Frame Cache (Seconds)', default=0,
+                                     help='How long the data frame of a direct table is reused by its analyses, per user and companies. '
+                                          '0 runs the script on every call, keep it for scripts depending on the filters of the analysis.')
+    frame_cache_date = fields.Datetime(string='Data Frame Built On', compute='_compute_frame_cache_date')
+
     is_template = fields.Boolean('Is Template', default = False)
     is_ai = fields.Boolean('Generated By AI')
     # Create Function Get Data From Dummy
@@ -276,7 +422,7 @@ class IZITable(models.Model):
     @api.onchange('stored_option')
     def onchange_stored_option(self):
         self.ensure_one()
-        if self.stored_option == 'stored':
+        if self.stored_option in ('stored', 'materialized'):
             self.is_query = False
             self.is_stored = True
             self.is_direct = False
@@ -325,7 +471,7 @@ class IZITable(models.Model):
                         'interval_type': 'days',
                         # 'numbercall': -1,
                         'active': False,
-                        'code': DEFAULT_PYTHON_CODE,
+                        'code': DEFAULT_PYTHON_CODE + (DEFAULT_PYTHON_CODE_WITH_MATERIALIZED_VIEW if vals.get('stored_option') == 'materialized' else ''),
                         'analytic': True,
                     })
                     vals.update({
@@ -369,7 +515,16 @@ class IZITable(models.Model):
                 vals.update({
                     'cron_id': table_cron.id,
                 })
+        # Switching From Or To A Materialized View Changes The Kind Of The Mart Relation
+        rebuild_tables = self.filtered(lambda t: 'stored_option' in vals and (t.stored_option == 'materialized') != (vals['stored_option'] == 'materialized'))
         res = super(IZITable, self).write(vals)
+        if {'main_code', 'cron_code'} & set(vals):
+            self.clear_frame_cache()
+        if 'db_query' in vals:
+            rebuild_tables |= self.filtered(lambda t: t.stored_option == 'materialized' and t.is_stored)
+        rebuild_tables.filtered(lambda t: t.user_defined and t.is_stored).update_schema_store_table()
+        if {'refresh_mode', 'incremental_key_fields'} & set(vals):
+            self._create_store_key_index()
         # User Defined Query / Table View Automatically Get Fields
         if self.user_defined and not self.is_stored:
             if 'db_query' in vals:
@@ -380,6 +535,7 @@ class IZITable(models.Model):
         return res
 
     def unlink(self):
+        self.clear_frame_cache()
         self.destroy_schema_store_table()
         if self.cron_id:
             self.cron_id.unlink()
@@ -424,6 +580,12 @@ class IZITable(models.Model):
             }
     
     def create_mart_table_from_query(self):
+        return self._create_mart_table_from_query('stored')
+
+    def create_materialized_view_from_query(self):
+        return self._create_mart_table_from_query('materialized')
+
+    def _create_mart_table_from_query(self, stored_option):
         self.ensure_one()
         if self.user_defined and not self.is_stored and self.db_query:
             store_name = 'Mart %s' % self.name
@@ -437,17 +599,22 @@ class IZITable(models.Model):
                     'field_type_origin_selection': field.field_type_origin_selection or 'varchar',
                     'field_type_origin': field.field_type_origin or 'varchar',
                 }))
+            main_code = DEFAULT_PYTHON_CODE_WITH_QUERY % {
+                'store_table_name': store_table_name,
+                'db_query': self.db_query,
+            }
+            if stored_option == 'materialized':
+                main_code = DEFAULT_PYTHON_CODE_WITH_MATERIALIZED_VIEW
             izi_table = self.copy({
                 'name': store_name,
                 'is_stored': True,
-                'main_code': DEFAULT_PYTHON_CODE_WITH_QUERY % {
-                    'store_table_name': store_table_name,
-                    'db_query': self.db_query,
-                },
+                'main_code': main_code,
                 'field_ids': field_ids,
-                'stored_option': 'stored',
+                'stored_option': stored_option,
             })
-            izi_table.update_schema_store_table()
+            # The View Was Already Built On Create, Running Its Query Again Is Not Needed
+            if stored_option != 'materialized':
+                izi_table.update_schema_store_table()
             # Open Newly Created Store Table
             return {
                 'name': _('Store Table'),
@@ -556,7 +723,7 @@ class IZITable(models.Model):
             field_by_name[field_record.field_name] = field_record
 
         # Check
-        if self.is_stored:
+        if self.is_stored and self.stored_option != 'materialized':
             return True
             # By default, fields in stored tables are defined manually
             # Or it can be generated by python code with different method, 
@@ -668,68 +835,568 @@ class IZITable(models.Model):
 
     def build_schema_store_table(self):
         for izi_table in self:
-            if izi_table.is_stored and izi_table.user_defined and izi_table.field_ids:
+            if izi_table.is_stored and izi_table.user_defined and izi_table.stored_option == 'materialized':
+                if izi_table.store_table_name:
+                    izi_table._create_materialized_view()
+                    izi_table._create_store_key_index()
+                    izi_table.index_ids.filtered(lambda i: i.state == 'created').create_store_index()
+            elif izi_table.is_stored and izi_table.user_defined and izi_table.field_ids:
                 table_name = izi_table.store_table_name
-                list_fields = []
-                for izi_field in izi_table.field_ids:
-                    list_fields.append("%s %s" % (izi_field.field_name, izi_field.field_type_origin.upper()))
-                fields_query = ", ".join(list_fields)
                 if table_name:
-                    create_table_query = "CREATE TABLE IF NOT EXISTS %s (%s);" % (
-                        table_name, fields_query)
-                    self.env.cr.execute(create_table_query)
+                    izi_table._create_store_table(table_name)
+                    izi_table._create_store_key_index()
+                    # Indexes Created Before Survive Schema Rebuilds
+                    izi_table.index_ids.filtered(lambda i: i.state == 'created').create_store_index()
+
+    def _create_store_table(self, table_name):
+        self.ensure_one()
+        list_fields = []
+        for izi_field in self.field_ids:
+            list_fields.append("%s %s" % (izi_field.field_name, izi_field.field_type_origin.upper()))
+        fields_query = ", ".join(list_fields)
+        create_table_query = "CREATE TABLE IF NOT EXISTS %s (%s);" % (
+            table_name, fields_query)
+        self.env.cr.execute(create_table_query)
+
+    def _create_materialized_view(self):
+        # The Query Runs Once Here, Then Each Scheduler Run Refreshes The View Inside The Database
+        self.ensure_one()
+        if self.source_id.type != 'db_odoo':
+            raise ValidationError(_('Materialized views are only available for tables of the Odoo database.'))
+        if not self.db_query:
+            raise ValidationError(_('Table %s needs a database query to be materialized.') % self.name)
+        view_query = self.db_query.strip().rstrip(';')
+        # Special Variables Would Be Frozen In The View Definition, REFRESH Reuses The Values Of The Creation Forever
+        if self.env['izi.analysis'].check_special_variable(view_query) != view_query:
+            raise ValidationError(_('Table %s can not be materialized, its query uses special variables such as #user_id or #company_ids.') % self.name)
+        self.source_id.check_query_db_odoo(query=view_query)
+        self.env.cr.execute('CREATE MATERIALIZED VIEW IF NOT EXISTS %s AS %s' % (self.store_table_name, view_query))
+
+    def _get_store_relation_kind(self, table_name):
+        # r For Tables, m For Materialized Views, False When The Relation Does Not Exist
+        self.env.cr.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', (table_name,))
+        res = self.env.cr.fetchone()
+        return res and res[0] or False
 
     def destroy_schema_store_table(self):
         for izi_table in self:
-            if izi_table.is_stored and izi_table.user_defined and izi_table.field_ids:
+            if izi_table.is_stored and izi_table.user_defined and (izi_table.field_ids or izi_table.stored_option == 'materialized'):
                 table_name = izi_table.store_table_name
                 if table_name:
-                    drop_table_query = "DROP TABLE IF EXISTS %s" % table_name
-                    self.env.cr.execute(drop_table_query)
+                    relation_kind = izi_table._get_store_relation_kind(table_name)
+                    if relation_kind == 'm':
+                        self.env.cr.execute('DROP MATERIALIZED VIEW IF EXISTS %s' % table_name)
+                    elif relation_kind:
+                        drop_table_query = "DROP TABLE IF EXISTS %s" % table_name
+                        self.env.cr.execute(drop_table_query)
+
+    def refresh_materialized_view(self):
+        # CONCURRENTLY Keeps The View Readable During The Refresh, It Needs The Unique Index Of The Key Fields
+        for izi_table in self:
+            if izi_table.stored_option != 'materialized' or not izi_table.store_table_name:
+                continue
+            start = time.monotonic()
+            if izi_table._get_store_relation_kind(izi_table.store_table_name) != 'm':
+                izi_table.update_schema_store_table()
+            elif izi_table._get_incremental_key_fields():
+                self.env.cr.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY %s' % izi_table.store_table_name)
+            else:
+                self.env.cr.execute('REFRESH MATERIALIZED VIEW %s' % izi_table.store_table_name)
+            izi_table.invalidate_analysis_cache()
+            _logger.info('Refreshed materialized view %s in %.2f s', izi_table.store_table_name, time.monotonic() - start)
 
     def update_schema_store_table(self):
         for izi_table in self:
-            if izi_table.is_stored and izi_table.user_defined and izi_table.field_ids:
+            if izi_table.is_stored and izi_table.user_defined and izi_table.stored_option == 'materialized':
                 izi_table.destroy_schema_store_table()
+                # Fields Follow The Columns Of The View, The Indexes Are Built Once They Are Known
+                izi_table._create_materialized_view()
+                izi_table.get_table_fields()
                 izi_table.build_schema_store_table()
+                izi_table.invalidate_analysis_cache()
+            elif izi_table.is_stored and izi_table.user_defined and izi_table.field_ids:
+                if izi_table.refresh_mode == 'swap' and izi_table.store_table_name:
+                    # The New Schema Replaces The Table In One Rename, Readers Never See It Missing
+                    izi_table.prepare_shadow_table()
+                    izi_table.swap_shadow_table()
+                else:
+                    izi_table.destroy_schema_store_table()
+                    izi_table.build_schema_store_table()
+                izi_table.invalidate_analysis_cache()
+
+    def _get_load_table_name(self):
+        # Table The Refresh Writes To, The Shadow Table While A Swap Refresh Runs
+        self.ensure_one()
+        return self._context.get('izi_table_redirects', {}).get(self.store_table_name, self.store_table_name)
+
+    def prepare_shadow_table(self, copy_data=False):
+        # Creates <store_table_name>__next With The Current Schema, Returns The Redirect Of The Load
+        # With copy_data It Starts From The Current Rows, Scripts Reloading A Window Or Merging Keep The Rest Of The Mart
+        redirects = {}
+        for izi_table in self:
+            shadow_table_name = get_shadow_name(izi_table.store_table_name)
+            self.env.cr.execute('DROP TABLE IF EXISTS %s' % shadow_table_name)
+            izi_table._create_store_table(shadow_table_name)
+            if copy_data:
+                izi_table._copy_shadow_table_data(shadow_table_name)
+            redirects[izi_table.store_table_name] = shadow_table_name
+        return redirects
+
+    def _copy_shadow_table_data(self, shadow_table_name):
+        # Only The Columns Both In The Schema And In The Current Table, A Script Truncating The Load Table Drops Them Anyway
+        self.ensure_one()
+        self.env.cr.execute('''
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+        ''', (self.store_table_name,))
+        table_columns = [row[0] for row in self.env.cr.fetchall()]
+        columns = [field_name for field_name in self.field_ids.mapped('field_name') if field_name in table_columns]
+        if columns:
+            self.env.cr.execute('INSERT INTO %s (%s) SELECT %s FROM %s' % (
+                shadow_table_name, ', '.join(columns), ', '.join(columns), self.store_table_name))
+
+    def swap_shadow_table(self):
+        # Indexes Are Built On The Loaded Shadow Table, Then It Takes The Name Of The Mart Table
+        # The Renames Only Lock The Mart Table Until The End Of The Transaction, The Load Itself Never Does
+        for izi_table in self:
+            table_name = izi_table.store_table_name
+            shadow_table_name = get_shadow_name(table_name)
+            old_table_name = '%s__old' % table_name[:58]
+            indexes = izi_table.index_ids.filtered(lambda i: i.state == 'created')
+            indexes.create_store_index(table_name=shadow_table_name)
+            self.env.cr.execute('DROP TABLE IF EXISTS %s' % old_table_name)
+            self.env.cr.execute('ALTER TABLE IF EXISTS %s RENAME TO %s' % (table_name, old_table_name))
+            self.env.cr.execute('ALTER TABLE %s RENAME TO %s' % (shadow_table_name, table_name))
+            self.env.cr.execute('DROP TABLE IF EXISTS %s' % old_table_name)
+            for index in indexes:
+                self.env.cr.execute('ALTER INDEX IF EXISTS %s RENAME TO %s' % (get_shadow_name(index.name), index.name))
+            izi_table.invalidate_analysis_cache()
+
+    def get_index_advice(self):
+        # Indexes Worth Having On The Mart Table, From The Fields Its Analyses Filter, Group And Sort By
+        # Date Fields Get A BRIN Index, Mart Tables Are Mostly Filled In Date Order. Other Fields Get A B-Tree Index
+        self.ensure_one()
+        advice = {}
+        if not self.is_stored or self.is_direct or not self.store_table_name:
+            return []
+
+        def add_advice(field, reason):
+            if not field or field.table_id != self:
+                return
+            method = 'brin' if field.field_type in ('date', 'datetime') else 'btree'
+            key = (field.field_name, method)
+            if key not in advice:
+                advice[key] = {
+                    'field_names': field.field_name,
+                    'method': method,
+                    'reasons': [],
+                }
+            if reason not in advice[key]['reasons']:
+                advice[key]['reasons'].append(reason)
+
+        for analysis in self.analysis_ids:
+            add_advice(analysis.date_field_id, _('Date filter of %s') % analysis.name)
+            for fltr in analysis.filter_ids:
+                add_advice(fltr.field_id, _('Filter of %s') % analysis.name)
+            for dimension in analysis.dimension_ids:
+                add_advice(dimension.field_id, _('Dimension of %s') % analysis.name)
+            for sort in analysis.sort_ids:
+                add_advice(sort.field_id, _('Sort of %s') % analysis.name)
+        return list(advice.values())
+
+    def action_advise_indexes(self):
+        for izi_table in self:
+            existing = {(index.field_names, index.method): index for index in izi_table.index_ids}
+            for advice in izi_table.get_index_advice():
+                reason = ', '.join(advice.get('reasons'))
+                index = existing.get((advice.get('field_names'), advice.get('method')))
+                if index:
+                    index.reason = reason
+                else:
+                    self.env['izi.table.index'].create({
+                        'table_id': izi_table.id,
+                        'field_names': advice.get('field_names'),
+                        'method': advice.get('method'),
+                        'reason': reason,
+                    })
+        return True
+
+    def _get_frame_cache_digest(self):
+        # Script Output Can Depend On The User And Its Companies Through Record Rules Or env.user
+        self.ensure_one()
+        key = '%s\n%s\n%s' % (self.cron_id.code or '', self.env.uid, ','.join(str(company_id) for company_id in self.env.companies.ids))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _get_frame_cache_path(self, digest=False):
+        self.ensure_one()
+        path = os.path.join(config.filestore(self.env.cr.dbname), 'izi_frames')
+        os.makedirs(path, exist_ok=True)
+        return os.path.join(path, '%s_%s.parquet' % (self.id, digest or '*'))
+
+    def _compute_frame_cache_date(self):
+        dbname = self.env.cr.dbname
+        for izi_table in self:
+            built_at = False
+            if izi_table.id and izi_table.is_direct:
+                digest = izi_table._get_frame_cache_digest()
+                entry = _frame_cache.get((dbname, izi_table.id, digest))
+                if entry:
+                    built_at = entry[0]
+                elif pyarrow and os.path.exists(izi_table._get_frame_cache_path(digest)):
+                    built_at = os.path.getmtime(izi_table._get_frame_cache_path(digest))
+            izi_table.frame_cache_date = datetime.utcfromtimestamp(built_at) if built_at else False
+
+    def _store_frame_cache(self, df, digest, built_at):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > FRAME_CACHE_MAX_BYTES:
+            return
+        key = (self.env.cr.dbname, self.id, digest)
+        with _frame_cache_lock:
+            _frame_cache[key] = (built_at, digest, size, df)
+            _frame_cache.move_to_end(key)
+            total_size = sum(entry[2] for entry in _frame_cache.values())
+            while total_size > FRAME_CACHE_MAX_BYTES:
+                total_size -= _frame_cache.popitem(last=False)[1][2]
+
+    def _get_cached_dataframe(self, digest):
+        key = (self.env.cr.dbname, self.id, digest)
+        now = time.time()
+        with _frame_cache_lock:
+            entry = _frame_cache.get(key)
+            if entry and entry[1] == digest and entry[0] + self.frame_cache_ttl > now:
+                _frame_cache.move_to_end(key)
+                return entry[3]
+        if not pyarrow:
+            return None
+        # Built By Another Worker
+        path = self._get_frame_cache_path(digest)
+        try:
+            built_at = os.path.getmtime(path)
+            if built_at + self.frame_cache_ttl <= now:
+                return None
+            df = pandas.read_parquet(path, memory_map=True)
+        except Exception:
+            return None
+        self._store_frame_cache(df, digest, built_at)
+        return df
+
+    def _set_cached_dataframe(self, df, digest):
+        built_at = time.time()
+        if pyarrow:
+            path = self._get_frame_cache_path(digest)
+            tmp_path = '%s.%s.tmp' % (path, os.getpid())
+            try:
+                df.to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+                built_at = os.path.getmtime(path)
+            except Exception as e:
+                # Columns Mixing Types Can Not Be Written As Parquet, The Frame Stays In Memory Only
+                _logger.warning('Data frame of table %s is not written to disk: %s', self.name, e)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self._store_frame_cache(df, digest, built_at)
+
+    def get_dataframe(self, **kwargs):
+        # Runs The Script Of A Direct Table Or Returns Its Cached Data Frame
+        # The Cached Frame Is The Raw Output Of The Script, The Filters Of Each Analysis Are Applied Afterwards
+        # Scripts Whose Output Depends On The Analysis Kwargs Must Keep frame_cache_ttl At 0
+        self.ensure_one()
+        cron_action = self.cron_id.with_context(izi_table=kwargs.get('analysis') or self, kwargs=kwargs.get('kwargs') or {}).ir_actions_server_id
+        if self.frame_cache_ttl <= 0:
+            return cron_action.run()
+        digest = self._get_frame_cache_digest()
+        df = self._get_cached_dataframe(digest)
+        if df is not None:
+            return {
+                'dataframe': df.copy(),
+            }
+        res = cron_action.run()
+        if res and type(res) == dict and isinstance(res.get('dataframe'), pandas.DataFrame):
+            self._set_cached_dataframe(res.get('dataframe'), digest)
+            res = dict(res, dataframe=res.get('dataframe').copy())
+        return res
+
+    def clear_frame_cache(self):
+        dbname = self.env.cr.dbname
+        for izi_table in self:
+            with _frame_cache_lock:
+                for key in [key for key in _frame_cache if key[:2] == (dbname, izi_table.id)]:
+                    del _frame_cache[key]
+            clear_frame_date_column_cache(dbname, izi_table.id)
+            for path in glob.glob(izi_table._get_frame_cache_path()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def action_refresh_frame_cache(self):
+        for izi_table in self.filtered(lambda t: t.is_direct and t.cron_id):
+            izi_table.clear_frame_cache()
+            izi_table.get_dataframe()
+            izi_table.analysis_ids.action_clear_cache()
+        return True
+
+    @api.model
+    @tools.ormcache('table_id')
+    def _get_field_metadata(self, table_id):
+        # Alias Maps And Types Of The Table Fields, Cleared When An izi.table.field Change Is Committed
+        return self._compute_field_metadata(table_id)
+
+    @api.model
+    def _compute_field_metadata(self, table_id):
+        field_by_alias = {}
+        field_type_by_alias = {}
+        alias_by_field_id = {}
+        field_id_by_name = {}
+        for field in self.env['izi.table.field'].sudo().search([('table_id', '=', table_id)]):
+            field_by_alias[field.name] = field.field_name
+            field_type_by_alias[field.name] = field.field_type
+            alias_by_field_id[field.id] = field.name
+            field_id_by_name[field.field_name] = field.id
+        return {
+            'field_by_alias': field_by_alias,
+            'field_type_by_alias': field_type_by_alias,
+            'alias_by_field_id': alias_by_field_id,
+            'field_id_by_name': field_id_by_name,
+        }
+
+    def get_field_metadata(self):
+        # Copies Of The Cached Maps, The Analysis Adds The Aliases Of Its Dimensions And Metrics To Them
+        self.ensure_one()
+        # Tables Whose Fields Changed In This Transaction Are Read Uncached Until The Commit
+        if self.id in self.env.cr.postcommit.data.get('izi.table.field.changed', ()):
+            field_metadata = self._compute_field_metadata(self.id)
+        else:
+            field_metadata = self._get_field_metadata(self.id)
+        metadata = {key: dict(value) for key, value in field_metadata.items()}
+        TableField = self.env['izi.table.field']
+        metadata['field_by_name'] = {field_name: TableField.browse(field_id) for field_name, field_id in metadata.pop('field_id_by_name').items()}
+        return metadata
+
+    @api.model
+    def get_lang_codes(self):
+        return [code for code, name in self.env['res.lang'].get_installed()]
+
+    @api.model
+    @tools.ormcache('model_name', 'field_name')
+    def _get_selection_labels(self, model_name, field_name):
+        # Labels Of A Selection Field By Value, Or None. Cleared With The Registry
+        model_field = self.env[model_name]._fields.get(field_name)
+        if not model_field or model_field.type != 'selection':
+            return None
+        selection = None
+        if not model_field.related:
+            selection = model_field.selection
+        else:
+            if model_field.related_field:
+                selection = model_field.related_field.selection
+                if not selection and model_field.related_field.args and type(model_field.related_field.args) == dict and model_field.related_field.args.get('selection'):
+                    selection = model_field.related_field.args['selection']
+        if selection:
+            return dict(selection)
+        return None
+
+    def invalidate_analysis_cache(self):
+        for izi_table in self:
+            if izi_table.store_table_name:
+                invalidate_analysis_cache(self.env.cr.dbname, 'table', izi_table.store_table_name)
 
     def delete_store_table_data(self, condition_query=''):
         self.ensure_one()
         if self.is_stored and self.db_query is not False:
-            table_name = self.store_table_name
+            table_name = self._get_load_table_name()
             delete_table_query = "DELETE FROM %s %s" % (table_name, condition_query)
             self.env.cr.execute(delete_table_query)
+            self.invalidate_analysis_cache()
 
     def insert_store_table_data(self, data=[], fetch=False):
+        # Delegates To copy_store_table_data, COPY Returns No Rows So fetch Gives An Empty List
         self.ensure_one()
         if self.is_stored and self.db_query is not False:
-            if data:
-                table_name = self.store_table_name
-
-                table_fields = []
-                for field in self.field_ids:
-                    table_fields.append(field.field_name)
-                fields_query = ", ".join(table_fields)
-
-                tuple_datas = []
-                for data in data:
-                    tuple_data = ()
-                    for table_field in table_fields:
-                        tuple_data += (data.get(table_field),)
-                    tuple_datas.append(tuple_data)
-
-                insert_datas = []
-                row_format = ', '.join(['%s' for x in range(len(self.field_ids))])
-                for tuple_data in tuple_datas:
-                    insert_datas.append(self.env.cr.mogrify(
-                        self.env.cr.mogrify("(%s)" % row_format), tuple_data).decode())
-                datas_query = ", ".join(insert_datas)
-
-                insert_table_query = "INSERT INTO %s(%s) VALUES %s" % (table_name, fields_query, datas_query)
-                self.env.cr.execute(self.env.cr.mogrify(insert_table_query))
-
+            if isinstance(data, pandas.DataFrame) or data:
+                self.copy_store_table_data(data)
                 if fetch:
-                    return self.env.cr.fetchall()
+                    return []
+
+    def copy_store_table_data(self, data, chunk_size=STORE_COPY_CHUNK_SIZE):
+        # Bulk Loads A DataFrame, A List Or An Iterator Of Dicts Into The Mart Table With COPY
+        # Values Are Converted By The field_type_origin Of The Table Fields, Missing Keys Are Loaded As NULL
+        self.ensure_one()
+        table_fields = self.field_ids.filtered(lambda f: f.field_name)
+        columns = table_fields.mapped('field_name')
+        type_origins = [field.field_type_origin for field in table_fields]
+        start = time.monotonic()
+        table_name = self._get_load_table_name()
+        count = copy_rows(self.env.cr, table_name, columns, iter_rows(data, columns), type_origins, chunk_size)
+        duration = time.monotonic() - start
+        rows_per_second = count / duration if duration else 0
+        _logger.info('Loaded %s rows into %s in %.2f s (%.0f rows/s)', count, table_name, duration, rows_per_second)
+        if count:
+            self.invalidate_analysis_cache()
+        return {
+            'rows': count,
+            'duration': duration,
+            'rows_per_second': rows_per_second,
+        }
+
+    @api.constrains('refresh_mode', 'incremental_key_fields', 'incremental_date_field', 'incremental_window_field', 'field_ids')
+    def _constraint_incremental_fields(self):
+        for izi_table in self:
+            if izi_table.refresh_mode != 'incremental' or izi_table.stored_option == 'materialized':
+                continue
+            if not izi_table.incremental_key_fields or not izi_table.incremental_date_field:
+                raise ValidationError(_('Incremental refresh of table %s needs the key fields and the watermark field.') % izi_table.name)
+            # Outside The Odoo Database Every Key Of The Window Is Fetched, Without Window That Is The Whole Source
+            if izi_table.source_id.type != 'db_odoo' and not izi_table.incremental_window_field:
+                raise ValidationError(_('Incremental refresh of table %s needs a window field for this data source.') % izi_table.name)
+            field_names = izi_table.field_ids.mapped('field_name')
+            for field_name in izi_table._get_incremental_key_fields() + [izi_table.incremental_date_field, izi_table.incremental_window_field]:
+                if field_name and field_name not in field_names:
+                    raise ValidationError(_('Field %s is not found in table %s.') % (field_name, izi_table.name))
+
+    def _get_incremental_key_fields(self):
+        self.ensure_one()
+        return [field_name.strip() for field_name in (self.incremental_key_fields or '').split(',') if field_name.strip()]
+
+    def _get_store_key_index_name(self):
+        self.ensure_one()
+        return '%s_incremental_key' % self.store_table_name[:46]
+
+    def _create_store_key_index(self):
+        # ON CONFLICT Of The Incremental Upsert Needs A Unique Index On The Key Fields
+        for izi_table in self:
+            if not izi_table.is_stored or izi_table.is_direct or not izi_table.store_table_name:
+                continue
+            index_name = izi_table._get_store_key_index_name()
+            self.env.cr.execute('DROP INDEX IF EXISTS %s' % index_name)
+            key_fields = izi_table._get_incremental_key_fields()
+            if (izi_table.refresh_mode == 'incremental' or izi_table.stored_option == 'materialized') and key_fields:
+                self.env.cr.execute('CREATE UNIQUE INDEX %s ON %s (%s)' % (
+                    index_name, izi_table.store_table_name, ', '.join(key_fields)))
+
+    def _get_incremental_window_query(self):
+        # Same Condition As The Delete Example Of The Scheduler Code, On The Interval Of The Table
+        # The Bounds Are Quoted By The Cursor, The Window Is Open On The Side Of An Unset Bound
+        # Only The Condition Is Bound, The Queries It Is Added To May Contain Literal % Signs
+        self.ensure_one()
+        if not self.incremental_window_field:
+            return ''
+        condition_queries = []
+        params = []
+        for operator, bound in (('>=', self.start_datetime), ('<=', self.end_datetime)):
+            if bound:
+                condition_queries.append('%s %s %%s' % (self.incremental_window_field, operator))
+                params.append(bound)
+        if not condition_queries:
+            return ''
+        return self.env.cr.mogrify('WHERE %s' % ' AND '.join(condition_queries), params).decode()
+
+    def _copy_temp_table(self, suffix, columns, data):
+        # Session Table Shaped Like The Mart Columns, Dropped At The End Of The Transaction
+        table_name = self._get_load_table_name()
+        temp_table_name = '%s__%s' % (table_name[:50], suffix)
+        type_origin_by_name = {field.field_name: field.field_type_origin for field in self.field_ids}
+        self.env.cr.execute('CREATE TEMP TABLE IF NOT EXISTS %s ON COMMIT DROP AS SELECT %s FROM %s WITH NO DATA' % (
+            temp_table_name, ', '.join(columns), table_name))
+        self.env.cr.execute('TRUNCATE %s' % temp_table_name)
+        copy_rows(self.env.cr, temp_table_name, columns, iter_rows(data, columns),
+                  [type_origin_by_name.get(column) for column in columns])
+        return temp_table_name
+
+    def upsert_store_table_data(self, data):
+        # Loads The Rows With COPY Into A Temporary Table, Then Merges Them By The Key Fields
+        # DISTINCT ON Keeps One Row Per Key, ON CONFLICT Can Not Update The Same Row Twice
+        self.ensure_one()
+        table_name = self._get_load_table_name()
+        key_fields = self._get_incremental_key_fields()
+        columns = self.field_ids.filtered(lambda f: f.field_name).mapped('field_name')
+        temp_table_name = self._copy_temp_table('upsert', columns, data)
+        update_columns = [column for column in columns if column not in key_fields]
+        conflict_query = 'DO NOTHING'
+        if update_columns:
+            conflict_query = 'DO UPDATE SET %s' % ', '.join('%s = EXCLUDED.%s' % (column, column) for column in update_columns)
+        self.env.cr.execute('INSERT INTO %s (%s) SELECT DISTINCT ON (%s) %s FROM %s ON CONFLICT (%s) %s' % (
+            table_name, ', '.join(columns), ', '.join(key_fields), ', '.join(columns), temp_table_name,
+            ', '.join(key_fields), conflict_query))
+        count = self.env.cr.rowcount
+        if count:
+            self.invalidate_analysis_cache()
+        return count
+
+    def delete_missing_store_table_data(self, keys, condition_query=''):
+        # Deletes The Rows Within condition_query Whose Key Is Not In keys Anymore
+        self.ensure_one()
+        table_name = self._get_load_table_name()
+        key_fields = self._get_incremental_key_fields()
+        temp_table_name = self._copy_temp_table('keys', key_fields, keys)
+        key_query = ' AND '.join('k.%s IS NOT DISTINCT FROM t.%s' % (key_field, key_field) for key_field in key_fields)
+        self.env.cr.execute('DELETE FROM %s t %s %s NOT EXISTS (SELECT 1 FROM %s k WHERE %s)' % (
+            table_name, condition_query, 'AND' if condition_query else 'WHERE', temp_table_name, key_query))
+        count = self.env.cr.rowcount
+        if count:
+            self.invalidate_analysis_cache()
+        return count
+
+    def delete_missing_store_table_data_query(self, query, condition_query=''):
+        # Same As delete_missing_store_table_data When The Source Is This Database, The Anti Join Stays In SQL
+        self.ensure_one()
+        key_query = ' AND '.join('src.%s IS NOT DISTINCT FROM t.%s' % (key_field, key_field) for key_field in self._get_incremental_key_fields())
+        self.env.cr.execute('DELETE FROM %s t %s %s NOT EXISTS (SELECT 1 FROM (%s) src WHERE %s)' % (
+            self._get_load_table_name(), condition_query, 'AND' if condition_query else 'WHERE', query, key_query))
+        count = self.env.cr.rowcount
+        if count:
+            self.invalidate_analysis_cache()
+        return count
+
+    def refresh_store_table_data(self, query=False):
+        # Scheduler Entry Point Of The Mart Tables Built From A Query
+        self.ensure_one()
+        if self.stored_option == 'materialized':
+            return self.refresh_materialized_view()
+        if self.refresh_mode != 'incremental':
+            self.env.cr.execute('TRUNCATE %s' % self._get_load_table_name())
+            return self.copy_store_table_data(self.get_data_query(query))
+        return self.refresh_store_table_incremental(query)
+
+    def refresh_store_table_incremental(self, query):
+        # 1. Upsert The Source Rows Changed Since The Watermark
+        # 2. Delete The Mart Rows Within The Window Whose Key Disappeared From The Source, With An Anti Join On The Odoo Database, Else By Fetching The Keys
+        # 3. Move The Watermark To The Latest Change In The Mart Table
+        self.ensure_one()
+        start = time.monotonic()
+        date_field = self.incremental_date_field
+        key_fields = self._get_incremental_key_fields()
+        changed_query = 'SELECT * FROM (%s) src' % query
+        if self.incremental_watermark:
+            changed_query += " WHERE %s >= '%s'" % (date_field, fields.Datetime.to_string(self.incremental_watermark))
+        upserted = self.upsert_store_table_data(self.get_data_query(changed_query))
+
+        window_query = self._get_incremental_window_query()
+        if self.source_id.type == 'db_odoo':
+            deleted = self.delete_missing_store_table_data_query(query, condition_query=window_query)
+        else:
+            keys = self.get_data_query('SELECT %s FROM (%s) src %s' % (', '.join(key_fields), query, window_query))
+            deleted = self.delete_missing_store_table_data(keys, condition_query=window_query)
+
+        self.env.cr.execute('SELECT max(%s) FROM %s' % (date_field, self._get_load_table_name()))
+        watermark = self.env.cr.fetchone()[0]
+        if watermark:
+            watermark = fields.Datetime.to_datetime(watermark)
+            # timestamptz Columns Give Aware Datetimes, The Field Stores Naive UTC
+            if watermark.tzinfo:
+                watermark = watermark.astimezone(timezone.utc).replace(tzinfo=None)
+            self.incremental_watermark = watermark
+        duration = time.monotonic() - start
+        _logger.info('Refreshed %s incrementally in %.2f s: %s rows upserted, %s rows deleted', self.store_table_name, duration, upserted, deleted)
+        return {
+            'upserted': upserted,
+            'deleted': deleted,
+            'duration': duration,
+        }
+
+    def action_reset_incremental_watermark(self):
+        # The Next Refresh Extracts And Upserts Every Source Row
+        self.write({'incremental_watermark': False})
 
     def get_data_query(self, query):
         self.ensure_one()
@@ -989,6 +1656,36 @@ class IZITableField(models.Model):
         ('name_source_unique', 'unique(field_name, table_id)', 'Table Field Name Already Exist.')
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(IZITableField, self).create(vals_list)
+        self._mark_field_metadata_changed(records.table_id.ids)
+        return records
+
+    def write(self, vals):
+        table_ids = []
+        if {'name', 'field_name', 'field_type', 'table_id'} & set(vals):
+            table_ids = self.table_id.ids
+        res = super(IZITableField, self).write(vals)
+        if table_ids:
+            self._mark_field_metadata_changed(table_ids + self.table_id.ids)
+        return res
+
+    def unlink(self):
+        table_ids = self.table_id.ids
+        res = super(IZITableField, self).unlink()
+        self._mark_field_metadata_changed(table_ids)
+        return res
+
+    def _mark_field_metadata_changed(self, table_ids):
+        # Fields Are Synchronized One By One, The Registry Cache Is Cleared Once After The Commit
+        if not table_ids:
+            return
+        changed_table_ids = self.env.cr.postcommit.data.setdefault('izi.table.field.changed', set())
+        if not changed_table_ids:
+            self.env.cr.postcommit.add(self.env.registry.clear_cache)
+        changed_table_ids.update(table_ids)
+
     def get_field_type_mapping(self, type_origin, source_type):
         field_mapping = self.env['izi.table.field.mapping'].search(
             [('name', '=', type_origin), ('source_type', '=', source_type)])
@@ -1017,6 +1714,73 @@ class IZITableField(models.Model):
         for record in self:
             record.field_type_origin = record.field_type_origin_selection
 
+class IZITableIndex(models.Model):
+    _name = 'izi.table.index'
+    _description = 'IZI Table Index'
+    _order = 'table_id, field_names'
+
+    table_id = fields.Many2one('izi.table', string='Table', required=True, ondelete='cascade')
+    field_names = fields.Char(string='Columns', required=True, help='Field names of the mart table, separated by comma')
+    method = fields.Selection([
+        ('btree', 'B-Tree'),
+        ('brin', 'BRIN'),
+    ], string='Method', default='btree', required=True)
+    name = fields.Char(string='Index Name', compute='_compute_name', store=True)
+    reason = fields.Char(string='Reason')
+    state = fields.Selection([
+        ('proposed', 'Proposed'),
+        ('created', 'Created'),
+    ], string='State', default='proposed', required=True)
+
+    _sql_constraints = [
+        ('field_names_method_unique', 'unique(table_id, field_names, method)', 'Index Already Exist.')
+    ]
+
+    @api.depends('table_id.store_table_name', 'field_names', 'method')
+    def _compute_name(self):
+        for index in self:
+            index.name = False
+            if index.table_id.store_table_name and index.field_names:
+                name = '%s_%s_%s_idx' % (index.table_id.store_table_name, re.sub('[^A-Za-z0-9]+', '_', index.field_names), index.method)
+                if len(name) > 63:
+                    # Postgres Truncates Identifiers To 63 Bytes
+                    name = '%s_%s_idx' % (name[:48], hashlib.sha1(name.encode()).hexdigest()[:10])
+                index.name = name
+
+    def _get_columns(self):
+        self.ensure_one()
+        return [column.strip() for column in self.field_names.split(',') if column.strip()]
+
+    def create_store_index(self, table_name=False):
+        # With table_name The Index Is Built On That Shadow Table, Under The Shadow Name Of The Index
+        for index in self:
+            table = index.table_id
+            columns = index._get_columns()
+            table_field_names = table.field_ids.mapped('field_name')
+            # Columns Dropped From The Schema Are Skipped Until The Field Comes Back
+            if not table.store_table_name or not columns or not all(column in table_field_names for column in columns):
+                continue
+            self.env.cr.execute('CREATE INDEX IF NOT EXISTS %s ON %s USING %s (%s)' % (
+                get_shadow_name(index.name) if table_name else index.name, table_name or table.store_table_name,
+                index.method, ', '.join(columns)))
+
+    def action_create_index(self):
+        self.create_store_index()
+        self.write({'state': 'created'})
+        return True
+
+    def action_drop_index(self):
+        for index in self:
+            if index.name:
+                self.env.cr.execute('DROP INDEX IF EXISTS %s' % index.name)
+        self.write({'state': 'proposed'})
+        return True
+
+    def unlink(self):
+        self.filtered(lambda i: i.state == 'created').action_drop_index()
+        return super(IZITableIndex, self).unlink()
+
+
 class IZITableFieldMapping(models.Model):
     _name = 'izi.table.field.mapping'
     _description = 'IZI Table Field Mapping'
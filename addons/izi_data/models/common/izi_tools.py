@@ -4,15 +4,27 @@ from odoo.exceptions import UserError, ValidationError
 import logging
 import ast
 import json
+import itertools
+import re
 from psycopg2 import extensions
+from psycopg2.extras import execute_values
 from datetime import datetime, timedelta
 import psycopg2
 import math
 import random
 import pandas
+from .izi_analysis import invalidate_analysis_cache
+from .izi_table import STORE_COPY_CHUNK_SIZE, copy_rows, iter_rows
 
 _logger = logging.getLogger(__name__)
 
+# Statement And Its Target Relation, At The Start Of The Query Or After A Semicolon, Past Comments
+QUERY_TARGET_PATTERN = re.compile(
+    r'(?P<statement>(?:^|;)(?:\s|--[^\n]*(?:\n|$)|/\*.*?\*/)*'
+    r'(?:TRUNCATE(?:\s+TABLE)?(?:\s+ONLY)?|DELETE\s+FROM(?:\s+ONLY)?|UPDATE(?:\s+ONLY)?|INSERT\s+INTO|COPY)\s+)'
+    r'(?P<quote>"?)(?P<table>[A-Za-z_][A-Za-z0-9_$]*)(?P=quote)(?![A-Za-z0-9_$])',
+    re.IGNORECASE | re.DOTALL)
+
 class IZITools(models.TransientModel):
     _name = 'izi.tools'
     _description = 'IZI Tools'
@@ -63,9 +75,28 @@ class IZITools(models.TransientModel):
         self.check_su()
         return ast.literal_eval(data)
     
+    def _redirect_table_name(self, table_name):
+        # During A Swap Refresh The Mart Table Is Loaded Through Its Shadow Table
+        return self._context.get('izi_table_redirects', {}).get(table_name, table_name)
+
+    def _redirect_query(self, query):
+        # Only The Target Relation Of TRUNCATE, DELETE, UPDATE, INSERT And COPY Statements Is Redirected
+        # Table Names In Literals, Comments Or Subqueries Are Left Untouched
+        redirects = self._context.get('izi_table_redirects', {})
+        if not redirects:
+            return query
+
+        def redirect(match):
+            table_name = match.group('table')
+            if table_name not in redirects:
+                return match.group(0)
+            return '%s%s%s%s' % (match.group('statement'), match.group('quote'), redirects[table_name], match.group('quote'))
+        return QUERY_TARGET_PATTERN.sub(redirect, query)
+
     @api.model
     def query_insert(self, table_name, data, return_id=False):
         self.check_su()
+        table_name = self._redirect_table_name(table_name)
         if type(data) is not dict:
             raise UserError('Data must be in dictionary!')
         insert_query = 'INSERT INTO %s (%s) VALUES %s'
@@ -74,11 +105,64 @@ class IZITools(models.TransientModel):
         insert_query = self.env.cr.mogrify(insert_query, (extensions.AsIs(table_name), extensions.AsIs(
             ','.join(data.keys())), tuple(data.values())))
         self.env.cr.execute(insert_query)
+        invalidate_analysis_cache(self.env.cr.dbname, 'table', table_name)
         new_id = False
         if return_id:
             new_id = self.env.cr.fetchone()[0]
         return new_id
     
+    def _get_insert_columns(self, data, columns=None):
+        # Columns Given, Or Those Of The DataFrame, Or The Keys Of The First Dict (Generators Are Not Consumed)
+        if columns:
+            return list(columns), data
+        if isinstance(data, pandas.DataFrame):
+            return list(data.columns), data
+        iterator = iter(data)
+        first = next(iterator, None)
+        if first is None:
+            return [], []
+        if type(first) is not dict:
+            raise UserError('Data must be in dictionary!')
+        return list(first.keys()), itertools.chain([first], iterator)
+
+    @api.model
+    def query_insert_many(self, table_name, data, page_size=1000, columns=None):
+        # Inserts A List Of Dicts, A DataFrame Or A Generator With execute_values, page_size Rows Per INSERT
+        self.check_su()
+        columns, data = self._get_insert_columns(data, columns)
+        if not columns:
+            return 0
+        count = 0
+        rows = iter_rows(data, columns)
+
+        def counted_rows():
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        insert_query = 'INSERT INTO %s (%s) VALUES %%s' % (self._redirect_table_name(table_name), ','.join(columns))
+        execute_values(self.env.cr, insert_query, counted_rows(), page_size=page_size)
+        invalidate_analysis_cache(self.env.cr.dbname, 'table', table_name)
+        return count
+
+    @api.model
+    def query_copy(self, table_name, data, page_size=STORE_COPY_CHUNK_SIZE, columns=None):
+        # Loads A List Of Dicts, A DataFrame Or A Generator With COPY FROM STDIN, page_size Rows Per COPY
+        # Values Are Converted By The Field Types Of The Mart Table When It Is An izi.table
+        self.check_su()
+        columns, data = self._get_insert_columns(data, columns)
+        if not columns:
+            return 0
+        type_origins = None
+        izi_table = self.env['izi.table'].search([('store_table_name', '=', table_name)], limit=1)
+        if izi_table:
+            type_origin_by_name = {field.field_name: field.field_type_origin for field in izi_table.field_ids}
+            type_origins = [type_origin_by_name.get(column) for column in columns]
+        count = copy_rows(self.env.cr, self._redirect_table_name(table_name), columns, iter_rows(data, columns), type_origins, page_size)
+        invalidate_analysis_cache(self.env.cr.dbname, 'table', table_name)
+        return count
+
     @api.model
     def query_check(self, query):
         self.check_su()
@@ -107,7 +191,7 @@ class IZITools(models.TransientModel):
         if 'UPDATE' in query.upper() or 'DELETE' in query.upper():
             if 'WHERE' not in query.upper():
                 raise UserError('YOUR QUERY DO NOT HAVE WHERE CLAUSE. IT IS VERY DANGEROUS!')
-        self.env.cr.execute(query)
+        self.env.cr.execute(self._redirect_query(query))
         if check:
             res = self.env.cr.dictfetchall()
             raise UserError('''
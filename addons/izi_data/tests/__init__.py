@@ -1,2 +1,4 @@
 # -*- coding: utf-8 -*-
-# Copyright 2022 IZI PT Solusi Usaha Mudah
\ No newline at end of file
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+from . import test_analysis_cumulative_sum
+from . import test_copy_value
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+from odoo.tests.common import TransactionCase
+
+
+class TestAnalysisCumulativeSum(TransactionCase):
+
+    def test_window_queries(self):
+        # Running Totals Restart For Each Non Leading Dimension And Follow The Returned Order
+        csum_query_by_alias, order_queries = self.env['izi.analysis'].get_csum_window_queries(
+            csum_metrics=[('Total', 'sum(amount)')],
+            dimension_queries=['month', 'category'],
+            sort_queries=['month asc'],
+        )
+        self.assertEqual(order_queries, ['month asc', 'month', 'category'])
+        self.assertEqual(csum_query_by_alias, {
+            'Total': 'sum(sum(amount)) OVER (PARTITION BY category ORDER BY month asc, month, category '
+                     'ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) as "Total"',
+        })
+
+    def test_window_queries_without_dimension(self):
+        csum_query_by_alias, order_queries = self.env['izi.analysis'].get_csum_window_queries(
+            csum_metrics=[('Total', 'sum(amount)')],
+            dimension_queries=[],
+            sort_queries=[],
+        )
+        self.assertEqual(order_queries, [])
+        self.assertEqual(
+            csum_query_by_alias['Total'],
+            'sum(sum(amount)) OVER (ORDER BY 1 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) as "Total"')
+
+    def test_window_runs_before_limit(self):
+        # The Limit Truncates The Rows, Not The Running Totals
+        csum_query_by_alias, order_queries = self.env['izi.analysis'].get_csum_window_queries(
+            csum_metrics=[('Total', 'sum(amount)')],
+            dimension_queries=['month', 'category'],
+            sort_queries=['month desc'],
+        )
+        self.env.cr.execute('''
+            SELECT month, category, %s
+            FROM (VALUES (1, 'a', 10), (1, 'a', 5), (1, 'b', 1), (2, 'a', 20), (2, 'b', 2), (3, 'a', 30)) AS t (month, category, amount)
+            GROUP BY month, category
+            ORDER BY %s
+            LIMIT 4
+        ''' % (csum_query_by_alias['Total'], ', '.join(order_queries)))
+        self.assertEqual(self.env.cr.fetchall(), [
+            (3, 'a', 30),
+            (2, 'a', 50),
+            (2, 'b', 2),
+            (1, 'a', 65),
+        ])
+
+    def test_apply_cumulative_sum_by_group(self):
+        # ORM Analyses Accumulate In Row Order, Empty Values Count As 0
+        res_data = [
+            {'Month': 'Jan', 'Category': 'a', 'Total': 10},
+            {'Month': 'Jan', 'Category': 'b', 'Total': None},
+            {'Month': 'Feb', 'Category': 'a', 'Total': 5},
+            {'Month': 'Feb', 'Category': 'b', 'Total': 3},
+            {'Month': 'Mar', 'Category': 'a', 'Total': False},
+            {'Month': 'Mar', 'Category': False, 'Total': 7},
+        ]
+        res_data = self.env['izi.analysis'].apply_cumulative_sum_by_group(
+            res_data=res_data,
+            metric_name='Total',
+            groupby_fields=['Category'],
+        )
+        self.assertEqual([record['Total'] for record in res_data], [10, 0, 15, 3, 15, 7])
+        self.assertEqual([record['Month'] for record in res_data], ['Jan', 'Jan', 'Feb', 'Feb', 'Mar', 'Mar'])
+
+    def test_apply_cumulative_sum_without_group(self):
+        res_data = self.env['izi.analysis'].apply_cumulative_sum_by_group(
+            res_data=[{'Total': 1}, {'Total': 2.5}, {'Total': 3}],
+            metric_name='Total',
+        )
+        self.assertEqual([record['Total'] for record in res_data], [1, 3.5, 6.5])
+        self.assertEqual(self.env['izi.analysis'].apply_cumulative_sum_by_group(res_data=[], metric_name='Total'), [])
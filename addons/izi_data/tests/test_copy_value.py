@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright 2022 IZI PT Solusi Usaha Mudah
+from datetime import date, datetime, timedelta, timezone
+from odoo.tests.common import TransactionCase
+from odoo.addons.izi_data.models.common.izi_table import copy_rows, copy_value
+import numpy
+import pandas
+
+
+class TestCopyValue(TransactionCase):
+
+    def test_missing_values(self):
+        for value in (None, float('nan'), numpy.nan, pandas.NaT, pandas.NA):
+            self.assertEqual(copy_value(value), '\\N')
+            self.assertEqual(copy_value(value, 'int8'), '\\N')
+            self.assertEqual(copy_value(value, 'varchar'), '\\N')
+        self.assertEqual(copy_value('', 'numeric'), '\\N')
+        self.assertEqual(copy_value('', 'timestamp'), '\\N')
+
+    def test_integers(self):
+        # int8 Values Past 2^53 Are Not Rounded
+        self.assertEqual(copy_value(9007199254740993, 'int8'), '9007199254740993')
+        self.assertEqual(copy_value(numpy.int64(9007199254740993), 'int8'), '9007199254740993')
+        self.assertEqual(copy_value('9007199254740993', 'int8'), '9007199254740993')
+        self.assertEqual(copy_value(12.0, 'int4'), '12')
+        self.assertEqual(copy_value('12.0', 'int4'), '12')
+        self.assertEqual(copy_value(False, 'int4'), '\\N')
+
+    def test_booleans(self):
+        self.assertEqual(copy_value(False), 'f')
+        self.assertEqual(copy_value(True), 't')
+        self.assertEqual(copy_value(False, 'bool'), 'f')
+        self.assertEqual(copy_value('false', 'boolean'), 'f')
+        self.assertEqual(copy_value(1, 'boolean'), 't')
+        self.assertEqual(copy_value(False, 'varchar'), '\\N')
+
+    def test_dates(self):
+        tz = timezone(timedelta(hours=7))
+        value = datetime(2024, 1, 1, 10, 0, tzinfo=tz)
+        # Naive Columns Hold UTC, Columns With Time Zone Keep The Offset
+        self.assertEqual(copy_value(value, 'timestamp'), '2024-01-01T03:00:00')
+        self.assertEqual(copy_value(value, 'timestamptz'), '2024-01-01T10:00:00+07:00')
+        self.assertEqual(copy_value(pandas.Timestamp(value), 'timestamp'), '2024-01-01T03:00:00')
+        self.assertEqual(copy_value(datetime(2024, 1, 1, 10, 0), 'timestamp'), '2024-01-01T10:00:00')
+        self.assertEqual(copy_value(datetime(2024, 1, 1, 10, 0), 'date'), '2024-01-01')
+        self.assertEqual(copy_value(date(2024, 1, 1)), '2024-01-01')
+
+    def test_escaping(self):
+        self.assertEqual(copy_value('a\tb\nc\rd\\e'), 'a\\tb\\nc\\rd\\\\e')
+        self.assertEqual(copy_value({'a': 'b\tc'}), '{"a": "b\\\\tc"}')
+        self.assertEqual(copy_value([1, None]), '[1, null]')
+
+    def test_copy_rows(self):
+        # Values Read Back From PostgreSQL As They Were Given
+        self.env.cr.execute('''
+            CREATE TEMP TABLE izi_test_copy (name varchar, amount int8, active boolean, date timestamp)
+        ''')
+        rows = [
+            ('tab\there\nnew line \\ backslash', 9007199254740993, False, datetime(2024, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=7)))),
+            (pandas.NA, None, True, pandas.NaT),
+        ]
+        count = copy_rows(self.env.cr, 'izi_test_copy', ['name', 'amount', 'active', 'date'], rows,
+                          type_origins=['varchar', 'int8', 'boolean', 'timestamp'])
+        self.assertEqual(count, 2)
+        self.env.cr.execute('SELECT name, amount, active, date FROM izi_test_copy ORDER BY amount NULLS LAST')
+        self.assertEqual(self.env.cr.fetchall(), [
+            ('tab\there\nnew line \\ backslash', 9007199254740993, False, datetime(2024, 1, 1, 3, 0)),
+            (None, None, True, None),
+        ])